@@ -1,6 +1,7 @@
 """Classes to assist in authenticating to the GitHub API."""
 
 import logging
+import threading
 import time
 from datetime import datetime
 from os import environ
@@ -202,16 +203,23 @@ class GitHubTokenAuthenticator(APIAuthenticatorBase):
         self.active_token: Optional[TokenRateLimit] = (
             choice(list(self.tokens_map.values())) if len(self.tokens_map) else None
         )
+        # Streams may share their authenticator between threads, see
+        # `GitHubRestStream.request_aliased_fields`.
+        self._lock = threading.RLock()
 
     def get_next_auth_token(self) -> None:
-        tokens_list = list(self.tokens_map.items())
-        current_token = self.active_token.token if self.active_token else ""
-        shuffle(tokens_list)
-        for _, token_rate_limit in tokens_list:
-            if token_rate_limit.is_valid() and current_token != token_rate_limit.token:
-                self.active_token = token_rate_limit
-                self.logger.info(f"Switching to fresh auth token")
-                return
+        with self._lock:
+            tokens_list = list(self.tokens_map.items())
+            current_token = self.active_token.token if self.active_token else ""
+            shuffle(tokens_list)
+            for _, token_rate_limit in tokens_list:
+                if (
+                    token_rate_limit.is_valid()
+                    and current_token != token_rate_limit.token
+                ):
+                    self.active_token = token_rate_limit
+                    self.logger.info(f"Switching to fresh auth token")
+                    return
 
         raise RuntimeError(
             "All GitHub tokens have hit their rate limit. Stopping here."
@@ -220,11 +228,12 @@ class GitHubTokenAuthenticator(APIAuthenticatorBase):
     def update_rate_limit(
         self, response_headers: requests.models.CaseInsensitiveDict
     ) -> None:
-        # If no token or only one token is available, return early.
-        if len(self.tokens_map) <= 1 or self.active_token is None:
-            return
+        with self._lock:
+            # If no token or only one token is available, return early.
+            if len(self.tokens_map) <= 1 or self.active_token is None:
+                return
 
-        self.active_token.update_rate_limit(response_headers)
+            self.active_token.update_rate_limit(response_headers)
 
     @property
     def auth_headers(self) -> Dict[str, str]:
@@ -236,11 +245,14 @@ class GitHubTokenAuthenticator(APIAuthenticatorBase):
             HTTP headers for authentication.
         """
         result = super().auth_headers
-        if self.active_token:
+        with self._lock:
+            active_token = self.active_token
             # Make sure that our token is still valid or update it.
-            if not self.active_token.is_valid():
+            if active_token and not active_token.is_valid():
                 self.get_next_auth_token()
-            result["Authorization"] = f"token {self.active_token.token}"
+                active_token = self.active_token
+        if active_token:
+            result["Authorization"] = f"token {active_token.token}"
         else:
             self.logger.info(
                 "No auth token detected. "
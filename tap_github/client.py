@@ -1,20 +1,34 @@
 """REST client handling, including GitHubStream base class."""
 
 import collections
+import hashlib
 import inspect
+import json
+import queue
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from types import FrameType
-from typing import Any, Dict, Iterable, List, Optional, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 from urllib.parse import parse_qs, urlparse
 
 import requests
 from dateutil.parser import parse
 from nested_lookup import nested_lookup
+from singer_sdk import typing as th
 from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.streams import GraphQLStream, RESTStream
 
 from tap_github.authenticator import GitHubTokenAuthenticator
+from tap_github.utils.graphql import project_selection
+from tap_github.utils.local_store import LocalStore, open_local_store
+from tap_github.utils.state import StateWriter
+
+
+class ServerTimeoutError(Exception):
+    """GitHub gave up computing a page of results (HTTP 502 or 504)."""
 
 
 class GitHubRestStream(RESTStream):
@@ -31,7 +45,58 @@ class GitHubRestStream(RESTStream):
     # This only has effect on streams whose `replication_key` is `updated_at`.
     missing_since_parameter = False
 
+    # Set this parameter to True for endpoints which return the most recent records
+    # first without a "direction" parameter, to exit early on incremental syncs.
+    sorted_descending = False
+    # Set this parameter to True for endpoints which return the oldest records first
+    # and accept neither "since" nor "direction". Incremental syncs then paginate
+    # backwards from the last page until records are older than the bookmark,
+    # see `request_records_backwards`.
+    paginate_backwards = False
+
+    # GitHub returns a 502 or 504 when a page is too expensive to compute.
+    # Set this parameter to True to retry the same records with a smaller page size
+    # instead of failing, and to grow the page size back after successful pages.
+    # This only has effect on streams paginated by page number.
+    adaptive_page_size = False
+    # Each size divides the previous one so that the current offset always falls
+    # on a page boundary when shrinking.
+    ADAPTIVE_PAGE_SIZES = [100, 50, 25, 5, 1]
+    ADAPTIVE_PAGE_SIZE_GROWTH_AFTER = 3  # successful pages before growing back
+    TIMEOUT_HTTP_ERRORS = [502, 504]
+    _current_page_size: Optional[int] = None
+
+    # Types of repository events (e.g. "IssueCommentEvent") which can change this
+    # stream's data. With the `events_sync_planner` setting, partitions are skipped
+    # when none of these events happened since their last sync.
+    # Leave to None for streams whose changes are not visible in /events.
+    activity_event_types: Optional[List[str]] = None
+    # GitHub delivers events with a latency of up to 6 hours.
+    EVENTS_PLANNER_LAG = timedelta(hours=6)
+
+    # Set this parameter to True on streams without a replication key, to skip
+    # records which did not change since the last run if the `local_cache_path`
+    # and `suppress_unchanged_records` settings are set.
+    suppress_unchanged_records = False
+    _local_store_partition: Optional[str] = None
+
+    # Paths of fields, by output name, which GraphQL queries of the stream always
+    # request, e.g. to compute a primary key, even when deselected in the catalog.
+    graphql_required_fields: List[Tuple[str, ...]] = []
+    # Properties fed by each GraphQL field whose output name is not the property's
+    # own, e.g. `{"licenseInfo": ["license"]}`. Such fields are requested when
+    # any of their properties is selected. Other fields feed the property of
+    # their output name.
+    graphql_field_properties: Dict[str, List[str]] = {}
+
+    # Partitions of the stream state by context, see `get_context_state`.
+    _partition_state_index: Optional[Tuple[list, int, dict]] = None
+    # The last state returned by `get_context_state`.
+    _last_context_state: Optional[dict] = None
+
     _authenticator: Optional[GitHubTokenAuthenticator] = None
+    # The streams sending the queries of `request_aliased_fields`, one per worker.
+    _aliased_fields_streams: Optional[List["GitHubAliasedFieldsStream"]] = None
 
     @property
     def authenticator(self) -> GitHubTokenAuthenticator:
@@ -47,6 +112,12 @@ class GitHubRestStream(RESTStream):
     replication_key: Optional[str] = None
     tolerated_http_errors: List[int] = []
 
+    @property
+    def local_store(self) -> Optional[LocalStore]:
+        """Return the store shared by all streams, if `local_cache_path` is set."""
+        path = self.config.get("local_cache_path")
+        return open_local_store(path) if path else None
+
     @property
     def http_headers(self) -> Dict[str, str]:
         """Return the http headers needed."""
@@ -54,6 +125,70 @@ class GitHubRestStream(RESTStream):
         headers["User-Agent"] = cast(str, self.config.get("user_agent", "tap-github"))
         return headers
 
+    def get_context_state(self, context: Optional[dict]) -> dict:
+        """Return a writable state dict for the given context.
+
+        The SDK scans the list of partitions for each lookup, which is quadratic
+        over a run with thousands of repositories. Instead, we index the partitions
+        by context and rebuild the index whenever the list is replaced or grows
+        outside of this method.
+
+        The returned state is reported to the state writer, for delta STATE messages.
+        """
+        state = self.get_indexed_context_state(context)
+        self._last_context_state = state
+        if self.state_writer.delta:
+            self.state_writer.mark_dirty(self.name, self.stream_state, state)
+        return state
+
+    def get_indexed_context_state(self, context: Optional[dict]) -> dict:
+        """Return a writable state dict for the given context, see `get_context_state`."""
+        state_partition_context = self._get_state_partition_context(context)
+        if not state_partition_context:
+            return super().get_context_state(context)
+        try:
+            key = tuple(sorted(state_partition_context.items()))
+            hash(key)
+        except TypeError:
+            return super().get_context_state(context)
+
+        partitions = self.stream_state.setdefault("partitions", [])
+        index = self._partition_state_index
+        if index is None or index[0] is not partitions or index[1] != len(partitions):
+            partitions_by_key: dict = {}
+            for partition_state in partitions:
+                partition_key = tuple(sorted(partition_state["context"].items()))
+                try:
+                    partitions_by_key.setdefault(partition_key, partition_state)
+                except TypeError:
+                    continue  # This context has unhashable values, never looked up.
+            index = (partitions, len(partitions), partitions_by_key)
+
+        partition_state = index[2].get(key)
+        if partition_state is None:
+            partition_state = {"context": state_partition_context}
+            partitions.append(partition_state)
+            index[2][key] = partition_state
+        self._partition_state_index = (partitions, len(partitions), index[2])
+        return partition_state
+
+    @property
+    def state_writer(self) -> StateWriter:
+        """Return the writer of STATE messages, shared by all streams of the tap."""
+        return cast(Any, self._tap).state_writer
+
+    def _write_state_message(self) -> None:
+        """Write out a STATE message, with the format and cadence of the settings.
+
+        The sync of a top-level stream always ends with a full STATE message.
+        """
+        if self.state_writer.delta and self._last_context_state is not None:
+            # The SDK finalizes the state of a partition without looking it up again.
+            self.state_writer.mark_dirty(
+                self.name, self.stream_state, self._last_context_state
+            )
+        self.state_writer.write(self.tap_state, force=self.parent_stream_type is None)
+
     def get_next_page_token(
         self, response: requests.Response, previous_token: Optional[Any]
     ) -> Optional[Any]:
@@ -67,20 +202,6 @@ class GitHubRestStream(RESTStream):
         ):
             return None
 
-        # Leverage header links returned by the GitHub API.
-        if "next" not in response.links.keys():
-            return None
-
-        resp_json = response.json()
-        if isinstance(resp_json, list):
-            results = resp_json
-        else:
-            results = resp_json.get("items")
-
-        # Exit early if the response has no items. ? Maybe duplicative the "next" link check.
-        if not results:
-            return None
-
         # Unfortunately endpoints such as /starred, /stargazers, /events and /pulls do not support
         # the "since" parameter out of the box. So we use a workaround here to exit early.
         # For such streams, we sort by descending dates (most recent first), and paginate
@@ -100,12 +221,25 @@ class GitHubRestStream(RESTStream):
             if "direction" in request_parameters
             else None
         )
+        if self.sorted_descending:
+            direction = "desc"
+
+        # Leverage header links returned by the GitHub API.
+        if "next" not in response.links.keys():
+            return None
+
+        results = self.get_page_results(response)
+
+        # Exit early if the response has no items. ? Maybe duplicative the "next" link check.
+        if not results:
+            return None
+
+        replication_values = self.get_replication_key_values(results)
         if (
-            # commit_timestamp is a constructed key which does not exist in the raw response
-            self.replication_key != "commit_timestamp"
-            and since
+            since
             and direction == "desc"
-            and (parse(results[-1][self.replication_key]) < parse(since))
+            and replication_values
+            and replication_values[-1] < parse(since)
         ):
             return None
 
@@ -120,11 +254,33 @@ class GitHubRestStream(RESTStream):
 
         return (previous_token or 1) + 1
 
+    @staticmethod
+    def get_page_results(response: requests.Response) -> list:
+        """Return the list of results of a page, or of a search page."""
+        resp_json = response.json()
+        if isinstance(resp_json, list):
+            return resp_json
+        return resp_json.get("items") or []
+
+    def get_replication_key_values(self, results: list) -> List[datetime]:
+        """Return the replication key values of the results of a page, in order.
+
+        Records without a value, e.g. draft releases, are ignored.
+        """
+        # commit_timestamp is a constructed key which does not exist in the raw response
+        if not self.replication_key or self.replication_key == "commit_timestamp":
+            return []
+        return [
+            parse(result[self.replication_key])
+            for result in results
+            if isinstance(result, dict) and result.get(self.replication_key)
+        ]
+
     def get_url_params(
         self, context: Optional[Dict], next_page_token: Optional[Any]
     ) -> Dict[str, Any]:
         """Return a dictionary of values to be used in URL parameterization."""
-        params: dict = {"per_page": self.MAX_PER_PAGE}
+        params: dict = {"per_page": self._current_page_size or self.MAX_PER_PAGE}
         if next_page_token:
             params["page"] = next_page_token
 
@@ -142,7 +298,9 @@ class GitHubRestStream(RESTStream):
         elif self.replication_key == "commit_timestamp":
             params["direction"] = "desc"
 
-        elif self.replication_key:
+        elif self.replication_key and not (
+            self.sorted_descending or self.paginate_backwards
+        ):
             self.logger.warning(
                 f"The replication key '{self.replication_key}' is not fully supported by this client yet."
             )
@@ -171,6 +329,17 @@ class GitHubRestStream(RESTStream):
             https://docs.python-requests.org/en/latest/api/#requests.Response
         """
         full_path = urlparse(response.url).path
+        if (
+            self.adaptive_page_size
+            and response.status_code in self.TIMEOUT_HTTP_ERRORS
+            and self._current_page_size is not None
+            and self._current_page_size > min(self.ADAPTIVE_PAGE_SIZES)
+        ):
+            raise ServerTimeoutError(
+                f"{response.status_code} Server Error with {self._current_page_size} "
+                f"records per page (Reason: {response.reason}) for path: {full_path}"
+            )
+
         if response.status_code in self.tolerated_http_errors:
             msg = (
                 f"{response.status_code} Tolerated Status Code "
@@ -214,6 +383,250 @@ class GitHubRestStream(RESTStream):
             )
             raise RetriableAPIError(msg, response)
 
+    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+        """Return a generator of row-type dictionary objects.
+
+        Partitions of streams listed in the `change_gated_streams` setting are
+        skipped when their repository did not change since their last sync, and
+        partitions of streams in `min_refresh_intervals` when synced too recently.
+        """
+        if self.is_refreshed_recently(context):
+            self.logger.debug(
+                f"Synced less than {self.min_refresh_interval}s ago. "
+                f"Skipping '{self.name}' sync."
+            )
+            return
+        if self.is_repo_unchanged(context):
+            self.logger.debug(
+                f"Repository unchanged since last sync. Skipping '{self.name}' sync."
+            )
+            return
+        if self.is_repo_inactive(context):
+            self.logger.debug(
+                f"No matching events since last sync. Skipping '{self.name}' sync."
+            )
+            return
+
+        sync_started_at = time.time()
+        self._local_store_partition = json.dumps(
+            self._get_state_partition_context(context), sort_keys=True
+        )
+        yield from super().get_records(context)
+
+        local_store = self.local_store
+        if self.is_suppressing_unchanged_records() and local_store is not None:
+            # Forget about records which disappeared, in case they come back.
+            local_store.sweep(self.name, self._local_store_partition, sync_started_at)
+        if self.is_change_gated(context):
+            context = cast(dict, context)
+            state = self.get_context_state(context)
+            state["repo_activity"] = context["repo_activity"]
+        if self.is_activity_planned(context):
+            context = cast(dict, context)
+            state = self.get_context_state(context)
+            state["events_planner_bookmark"] = context["repo_events"]["fetched_at"]
+        if self.min_refresh_interval is not None:
+            state = self.get_context_state(context)
+            state["last_synced_at"] = datetime.fromtimestamp(
+                sync_started_at, timezone.utc
+            ).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    @property
+    def min_refresh_interval(self) -> Optional[int]:
+        """Return the minimum number of seconds between two syncs of a partition."""
+        return self.config.get("min_refresh_intervals", {}).get(self.name)
+
+    def is_refreshed_recently(self, context: Optional[dict]) -> bool:
+        """Return True if the partition was synced less than the interval ago."""
+        if self.min_refresh_interval is None:
+            return False
+        last_synced_at = self.get_context_state(context).get("last_synced_at")
+        if last_synced_at is None:
+            return False
+        elapsed = datetime.now(timezone.utc) - parse(last_synced_at)
+        return elapsed < timedelta(seconds=self.min_refresh_interval)
+
+    def is_suppressing_unchanged_records(self) -> bool:
+        """Return True if unchanged records of this stream are not emitted."""
+        return (
+            self.suppress_unchanged_records
+            and bool(self.config.get("suppress_unchanged_records"))
+            and self.local_store is not None
+        )
+
+    def is_record_unchanged(self, record: dict) -> bool:
+        """Store the fingerprint of a record and compare it with the previous one."""
+        local_store = self.local_store
+        if not self.is_suppressing_unchanged_records() or local_store is None:
+            return False
+        partition = cast(str, self._local_store_partition)
+        key = json.dumps([record.get(key) for key in self.primary_keys or []])
+        fingerprint = hashlib.sha1(
+            json.dumps(record, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        previous_fingerprint = local_store.get(self.name, partition, key)
+        local_store.set(self.name, partition, key, fingerprint)
+        return fingerprint == previous_fingerprint
+
+    def _write_record_message(self, record: dict) -> None:
+        """Write out a RECORD message, unless the record did not change."""
+        if self.is_record_unchanged(record):
+            return
+        super()._write_record_message(record)
+        self.state_writer.record_written()
+
+    def is_change_gated(self, context: Optional[dict]) -> bool:
+        """Return True if this partition is gated on its repository's activity."""
+        return (
+            context is not None
+            and bool(context.get("repo_activity"))
+            and self.name in self.config.get("change_gated_streams", [])
+        )
+
+    def is_repo_unchanged(self, context: Optional[dict]) -> bool:
+        """Return True if the repository's activity matches the one of the last sync."""
+        if not self.is_change_gated(context):
+            return False
+        context = cast(dict, context)
+        state = self.get_context_state(context)
+        return state.get("repo_activity") == context["repo_activity"]
+
+    def is_activity_planned(self, context: Optional[dict]) -> bool:
+        """Return True if this partition is planned from its repository's events."""
+        return (
+            context is not None
+            and "repo_events" in context
+            and self.activity_event_types is not None
+        )
+
+    def is_repo_inactive(self, context: Optional[dict]) -> bool:
+        """Return True if none of the stream's events happened since its last sync.
+
+        `context["repo_events"]` holds the latest date of each event type since
+        `since`, or None for `latest` if the events feed could not cover it.
+        """
+        if not self.is_activity_planned(context):
+            return False
+        context = cast(dict, context)
+        bookmark = self.get_context_state(context).get("events_planner_bookmark")
+        repo_events = context["repo_events"]
+        if (
+            bookmark is None
+            or repo_events["latest"] is None
+            or parse(repo_events["since"]) > parse(bookmark) - self.EVENTS_PLANNER_LAG
+        ):
+            return False
+        return not any(
+            parse(repo_events["latest"][event_type])
+            >= parse(bookmark) - self.EVENTS_PLANNER_LAG
+            for event_type in cast(List[str], self.activity_event_types)
+            if event_type in repo_events["latest"]
+        )
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Request records from REST endpoint(s), returning response records.
+
+        Streams with `adaptive_page_size` shrink the page size when GitHub times
+        out, and re-request the same offset instead of leaving a gap in the data.
+        """
+        if self.paginate_backwards:
+            since = self.get_starting_timestamp(context)
+            if since:
+                yield from self.request_records_backwards(context, since)
+                return
+        if not self.adaptive_page_size:
+            yield from super().request_records(context)
+            return
+
+        page_sizes = [s for s in self.ADAPTIVE_PAGE_SIZES if s <= self.MAX_PER_PAGE]
+        self._current_page_size = page_sizes[0]
+        successful_pages = 0
+        next_page_token: Optional[int] = None
+        decorated_request = self.request_decorator(self._request)
+
+        while True:
+            prepared_request = self.prepare_request(
+                context, next_page_token=next_page_token
+            )
+            try:
+                resp = decorated_request(prepared_request, context)
+            except ServerTimeoutError as e:
+                offset = ((next_page_token or 1) - 1) * self._current_page_size
+                self._current_page_size = page_sizes[
+                    page_sizes.index(self._current_page_size) + 1
+                ]
+                next_page_token = offset // self._current_page_size + 1
+                successful_pages = 0
+                self.logger.info(
+                    f"{e}. Retrying with {self._current_page_size} per page."
+                )
+                continue
+
+            yield from self.parse_response(resp)
+            previous_token = next_page_token
+            next_page_token = self.get_next_page_token(resp, previous_token)
+            if not next_page_token:
+                break
+            if next_page_token == previous_token:
+                raise RuntimeError(
+                    f"Loop detected in pagination. "
+                    f"Pagination token {next_page_token} is identical to prior token."
+                )
+
+            # Grow the page size back once GitHub keeps up again.
+            successful_pages += 1
+            if (
+                successful_pages >= self.ADAPTIVE_PAGE_SIZE_GROWTH_AFTER
+                and self._current_page_size != page_sizes[0]
+            ):
+                larger_page_size = page_sizes[
+                    page_sizes.index(self._current_page_size) - 1
+                ]
+                offset = (next_page_token - 1) * self._current_page_size
+                if offset % larger_page_size == 0:
+                    self._current_page_size = larger_page_size
+                    next_page_token = offset // larger_page_size + 1
+                    successful_pages = 0
+
+        self._current_page_size = None
+
+    def request_records_backwards(
+        self, context: Optional[dict], since: datetime
+    ) -> Iterable[dict]:
+        """Request the records updated since the bookmark, from the last page.
+
+        A first request of a single record gives the number of records through its
+        `last` link, and its record is not emitted. Pages are then requested from
+        the last one backwards, until a page only holds records older than the
+        bookmark. Older records of the pages are not emitted either.
+        """
+        decorated_request = self.request_decorator(self._request)
+        self._current_page_size = 1
+        try:
+            resp = decorated_request(self.prepare_request(context, None), context)
+        finally:
+            self._current_page_size = None
+        if "last" in resp.links:
+            parsed_url = urlparse(resp.links["last"]["url"])
+            record_count = int(parse_qs(parsed_url.query).get("page", ["1"])[0])
+        else:
+            record_count = len(self.get_page_results(resp))
+
+        page = (record_count + self.MAX_PER_PAGE - 1) // self.MAX_PER_PAGE
+        while page >= 1:
+            resp = decorated_request(self.prepare_request(context, page), context)
+            records = list(self.parse_response(resp))
+            yield from (
+                record
+                for record in records
+                if not record.get(self.replication_key)
+                or parse(record[self.replication_key]) >= since
+            )
+            replication_values = self.get_replication_key_values(records)
+            if replication_values and max(replication_values) < since:
+                return
+            page -= 1
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
         # TODO - Split into handle_reponse and parse_response.
@@ -234,6 +647,88 @@ class GitHubRestStream(RESTStream):
 
         yield from results
 
+    def get_graphql_selection(self, selection: str) -> str:
+        """Return the fields of a GraphQL selection of records selected in the catalog.
+
+        Fields are matched to properties by their alias if any, see `project_selection`,
+        or through `graphql_field_properties`.
+        """
+
+        def is_selected(path: Tuple[str, ...]) -> bool:
+            # Keep required fields, with their parents and sub-fields.
+            if any(
+                required[: len(path)] == path or path[: len(required)] == required
+                for required in self.graphql_required_fields
+            ):
+                return True
+            field_name, *sub_path = path
+            for property_name in self.graphql_field_properties.get(
+                field_name, [field_name]
+            ):
+                breadcrumb: Tuple[str, ...] = ("properties", property_name)
+                for sub_property_name in sub_path:
+                    breadcrumb += ("properties", sub_property_name)
+                if self.mask[breadcrumb]:
+                    return True
+            return False
+
+        return project_selection(selection, is_selected)
+
+    def request_aliased_fields(
+        self, fields: List[str], alias: str, batch_size: int, max_workers: int
+    ) -> Iterable[Tuple[int, Optional[dict]]]:
+        """Request GraphQL fields by chunks of `batch_size`, sent concurrently.
+
+        Each chunk is a single query aliasing its fields `<alias><index in chunk>`.
+        Each worker sends its chunks through a stream, and so a session, of its
+        own. They all share the authenticator of this stream.
+        Yield the index of each field in `fields` and its result, which is `None`
+        when GitHub found nothing.
+        """
+        if self._aliased_fields_streams is None:
+            self._aliased_fields_streams = []
+        while len(self._aliased_fields_streams) < max_workers:
+            stream = GitHubAliasedFieldsStream(self._tap)
+            stream._authenticator = self.authenticator
+            self._aliased_fields_streams.append(stream)
+        idle_streams: "queue.SimpleQueue[GitHubAliasedFieldsStream]" = (
+            queue.SimpleQueue()
+        )
+        for stream in self._aliased_fields_streams:
+            idle_streams.put(stream)
+
+        def request_chunk(start: int) -> List[Tuple[int, Optional[dict]]]:
+            chunk = fields[start : start + batch_size]
+            query = (
+                "query {"
+                + " ".join(f"{alias}{i}: {field}" for i, field in enumerate(chunk))
+                + " }"
+            )
+            stream = idle_streams.get()
+            try:
+                records = list(stream.request_records({"query": query}))
+            finally:
+                idle_streams.put(stream)
+            results = []
+            for record in records:
+                for item, result in record.items():
+                    results.append((start + int(item[len(alias) :]), result))
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for results in executor.map(
+                request_chunk, range(0, len(fields), batch_size)
+            ):
+                yield from results
+
+    def get_user_record(self, user: dict) -> dict:
+        """Complete a user of the GraphQL API with the fields of the REST API."""
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        user["gravatar_id"] = ""
+        user["url"] = f"{api_url_base}/users/{user['login']}"
+        user.setdefault("site_admin", False)
+        return user
+
     def post_process(self, row: dict, context: Optional[Dict[str, str]] = None) -> dict:
         """Add `repo_id` by default to all streams."""
         if context is not None and "repo_id" in context:
@@ -269,6 +764,17 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
     # the jsonpath under which to fetch the list of records from the graphql response
     query_jsonpath: str = "$.data.[*]"
 
+    # Streams with `adaptive_page_size` pass the size of their connections as
+    # query variables, e.g. `first: $pageSize_0`, declared here with their maximum.
+    # Queries then also request their cost in points. All sizes are divided by
+    # `_page_size_divisor`, which doubles when GitHub times out, and when a
+    # partition fit in a single page which cost more than 1 point. It halves back
+    # when partitions need several pages, as larger pages cost less per record.
+    page_size_variables: Dict[str, int] = {}
+    _page_size_divisor = 1
+    # Points and records of the queries of this stream, for the sync logs.
+    _query_cost: Tuple[int, int] = (0, 0)
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows.
 
@@ -348,9 +854,149 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
         params["per_page"] = self.MAX_PER_PAGE
         if next_page_token:
             params.update(next_page_token)
+        if self.adaptive_page_size:
+            params.update(self.get_page_sizes())
 
         since = self.get_starting_timestamp(context)
         if self.replication_key and since:
             params["since"] = str(since)
 
         return params
+
+    def get_page_sizes(self) -> Dict[str, int]:
+        """Return the current value of the page size variables of the query."""
+        return {
+            variable: max(1, max_size // self._page_size_divisor)
+            for variable, max_size in self.page_size_variables.items()
+        }
+
+    def can_shrink_page_size(self) -> bool:
+        return any(
+            max_size // self._page_size_divisor > 1
+            for max_size in self.page_size_variables.values()
+        )
+
+    def prepare_request_payload(
+        self, context: Optional[dict], next_page_token: Optional[Any]
+    ) -> Optional[dict]:
+        """Prepare the GraphQL request, with the cost of the query if adaptive."""
+        payload = cast(dict, super().prepare_request_payload(context, next_page_token))
+        if self.adaptive_page_size:
+            payload["query"] = re.sub(
+                r"(\bquery\b[^{]*{)",
+                r"\1 rateLimit { cost remaining resetAt }",
+                payload["query"],
+                count=1,
+            )
+        return payload
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate HTTP response, raising ServerTimeoutError on adaptive streams.
+
+        GitHub reports GraphQL timeouts either as an HTTP 502 or 504, or as an
+        error of a successful response.
+        """
+        if self.adaptive_page_size and self.can_shrink_page_size():
+            timed_out = response.status_code in self.TIMEOUT_HTTP_ERRORS
+            if response.status_code == 200:
+                errors = response.json().get("errors") or []
+                timed_out = any(
+                    "timeout" in str(error.get("message", "")).lower()
+                    for error in errors
+                )
+            if timed_out:
+                raise ServerTimeoutError(
+                    f"{response.status_code} GraphQL timeout with page sizes "
+                    f"{self.get_page_sizes()} for stream: {self.name}"
+                )
+        super().validate_response(response)
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Request records from the GraphQL API, returning response records.
+
+        Streams with `adaptive_page_size` retry the same cursors with smaller
+        pages when GitHub times out, and adjust the size of their pages from the
+        cost of their queries, see `page_size_variables`.
+        """
+        if not self.adaptive_page_size:
+            yield from super().request_records(context)
+            return
+
+        pages = 0
+        successful_pages = 0
+        next_page_token: Optional[Any] = None
+        decorated_request = self.request_decorator(self._request)
+        while True:
+            prepared_request = self.prepare_request(
+                context, next_page_token=next_page_token
+            )
+            try:
+                resp = decorated_request(prepared_request, context)
+            except ServerTimeoutError as e:
+                self._page_size_divisor *= 2
+                successful_pages = 0
+                self.logger.info(f"{e}. Retrying with {self.get_page_sizes()}.")
+                continue
+
+            records = list(self.parse_response(resp))
+            rate_limit = (resp.json().get("data") or {}).get("rateLimit") or {}
+            cost = rate_limit.get("cost", 0)
+            points, record_count = self._query_cost
+            self._query_cost = (points + cost, record_count + len(records))
+            yield from records
+
+            pages += 1
+            previous_token = next_page_token
+            next_page_token = self.get_next_page_token(resp, previous_token)
+            if not next_page_token:
+                break
+            if next_page_token == previous_token:
+                raise RuntimeError(
+                    f"Loop detected in pagination. "
+                    f"Pagination token {next_page_token} is identical to prior token."
+                )
+
+            # Grow the page size back once GitHub keeps up again.
+            successful_pages += 1
+            if (
+                successful_pages >= self.ADAPTIVE_PAGE_SIZE_GROWTH_AFTER
+                and self._page_size_divisor > 1
+            ):
+                self._page_size_divisor //= 2
+                successful_pages = 0
+
+        # Size the first page of the next partition.
+        page_size_divisor = self._page_size_divisor
+        if pages == 1 and cost > 1 and self.can_shrink_page_size():
+            self._page_size_divisor *= 2
+        elif pages > 1 and self._page_size_divisor > 1:
+            self._page_size_divisor //= 2
+        points, record_count = self._query_cost
+        # Partitions are often single repositories or users, only log changes.
+        log = (
+            self.logger.info
+            if self._page_size_divisor != page_size_divisor
+            else self.logger.debug
+        )
+        log(
+            f"{self.name} queries cost {points} points for {record_count} records "
+            f"so far ({rate_limit.get('remaining')} points remaining until "
+            f"{rate_limit.get('resetAt')}), next page sizes: {self.get_page_sizes()}."
+        )
+
+
+class GitHubAliasedFieldsStream(GitHubGraphqlStream):
+    """Stream sending the query of its context, see `request_aliased_fields`."""
+
+    name = "aliasedFieldsStream"
+    schema = th.PropertiesList(th.Property("id", th.StringType)).to_dict()
+
+    def get_url_params(
+        self, context: Optional[Dict], next_page_token: Optional[Any]
+    ) -> Dict[str, Any]:
+        return {}
+
+    def prepare_request_payload(
+        self, context: Optional[dict], next_page_token: Optional[Any]
+    ) -> Optional[dict]:
+        return {"query": cast(dict, context)["query"], "variables": {}}
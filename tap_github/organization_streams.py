@@ -1,10 +1,11 @@
 """User Stream types classes for tap-github."""
 
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 
 from singer_sdk import typing as th  # JSON Schema typing helpers
 
-from tap_github.client import GitHubRestStream
+from tap_github.client import GitHubGraphqlStream, GitHubRestStream
+from tap_github.repository_streams import GRAPHQL_USER_FIELDS
 
 
 class OrganizationStream(GitHubRestStream):
@@ -126,8 +127,133 @@ class TeamMembersStream(GitHubRestStream):
     primary_keys = ["id"]
     path = "/orgs/{org}/teams/{team_slug}/members"
     ignore_parent_replication_key = True
+    suppress_unchanged_records = True
     parent_stream_type = TeamsStream
     state_partitioning_keys = ["team_slug", "org"]
+    # With `graphql_team_memberships`, the members of all the teams of an
+    # organization are fetched with its first team, and kept until their sync.
+    # Their roles are kept by team and username for `team_roles`.
+    _team_members: Dict[Tuple[str, str], List[dict]] = {}
+    _team_roles: Dict[Tuple[str, str, str], dict] = {}
+    _memberships_org: Optional[str] = None
+    _teams_graphql_stream: Optional[GitHubGraphqlStream] = None
+    _members_graphql_stream: Optional[GitHubGraphqlStream] = None
+
+    def request_memberships(self, org: str) -> None:
+        """Fetch the members of all the teams of an organization, with their role.
+
+        Teams are requested 20 per page, with their first 100 members. The
+        members of larger teams are then requested 100 per page.
+        """
+
+        # use temp handmade streams to reuse the pagination of the tap
+        class TeamsTempStream(GitHubGraphqlStream):
+            name = "tempStream"
+            schema = th.PropertiesList(
+                th.Property("slug", th.StringType),
+            ).to_dict()
+            query_jsonpath = "$.data.organization.teams.nodes.[*]"
+            query = f"""
+              query organizationTeams($org: String! $nextPageCursor_0: String) {{
+                organization(login: $org) {{
+                  teams(first: 20 after: $nextPageCursor_0) {{
+                    pageInfo {{
+                      hasNextPage_0: hasNextPage
+                      startCursor_0: startCursor
+                      endCursor_0: endCursor
+                    }}
+                    nodes {{
+                      id: databaseId
+                      slug
+                      organization {{ id: databaseId }}
+                      members(first: 100) {{
+                        pageInfo {{ hasNextPage endCursor }}
+                        edges {{ role node {{ {GRAPHQL_USER_FIELDS} }} }}
+                      }}
+                    }}
+                  }}
+                }}
+              }}
+            """
+
+        class MembersTempStream(GitHubGraphqlStream):
+            name = "tempStream"
+            schema = th.PropertiesList(
+                th.Property("role", th.StringType),
+            ).to_dict()
+            query_jsonpath = "$.data.organization.team.members.edges.[*]"
+            query = f"""
+              query teamMembers(
+                $org: String! $team_slug: String! $nextPageCursor_0: String
+              ) {{
+                organization(login: $org) {{
+                  team(slug: $team_slug) {{
+                    members(first: 100 after: $nextPageCursor_0) {{
+                      pageInfo {{
+                        hasNextPage_0: hasNextPage
+                        startCursor_0: startCursor
+                        endCursor_0: endCursor
+                      }}
+                      edges {{ role node {{ {GRAPHQL_USER_FIELDS} }} }}
+                    }}
+                  }}
+                }}
+              }}
+            """
+
+        if self._teams_graphql_stream is None:
+            self._teams_graphql_stream = TeamsTempStream(self._tap)
+        if self._members_graphql_stream is None:
+            self._members_graphql_stream = MembersTempStream(self._tap)
+
+        self._team_members = {}
+        self._team_roles = {}
+        self._memberships_org = org
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        for team in self._teams_graphql_stream.request_records({"org": org}):
+            members = team["members"]
+            edges = members["edges"]
+            if members["pageInfo"]["hasNextPage"]:
+                edges += self._members_graphql_stream.request_records(
+                    {
+                        "org": org,
+                        "team_slug": team["slug"],
+                        "nextPageCursor_0": members["pageInfo"]["endCursor"],
+                    }
+                )
+
+            team_url = (
+                f"{api_url_base}/organizations/{team['organization']['id']}"
+                f"/team/{team['id']}"
+            )
+            self._team_members[(org, team["slug"])] = []
+            for edge in edges:
+                member = self.get_user_record(edge["node"])
+                self._team_members[(org, team["slug"])].append(member)
+                self._team_roles[(org, team["slug"], member["login"])] = {
+                    "url": f"{team_url}/memberships/{member['login']}",
+                    "role": edge["role"].lower(),
+                    # Pending members are not listed.
+                    "state": "active",
+                }
+
+    def get_team_role(self, org: str, team_slug: str, username: str) -> Optional[dict]:
+        """Return the membership of a user fetched with the team members."""
+        return self._team_roles.pop((org, team_slug, username), None)
+
+    def request_records(self, context: Optional[Dict]) -> Iterable[Dict]:
+        """Return the members of the team fetched through GraphQL, or request them."""
+        if context is not None and self.config.get("graphql_team_memberships"):
+            if context["org"] != self._memberships_org:
+                self.request_memberships(context["org"])
+            members = self._team_members.pop(
+                (context["org"], context["team_slug"]), None
+            )
+            # Teams created since the memberships were fetched are requested.
+            if members is not None:
+                yield from members
+                return
+        yield from super().request_records(context)
 
     def get_child_context(self, record: Dict, context: Optional[Dict]) -> dict:
         new_context = {"username": record["login"]}
@@ -167,6 +293,20 @@ class TeamRolesStream(GitHubRestStream):
     parent_stream_type = TeamMembersStream
     state_partitioning_keys = ["username", "team_slug", "org"]
 
+    def request_records(self, context: Optional[Dict]) -> Iterable[Dict]:
+        """Return the membership fetched with the team members, or request it."""
+        if context is not None and self.config.get("graphql_team_memberships"):
+            members_stream: TeamMembersStream = cast(Any, self._tap).streams[
+                TeamMembersStream.name
+            ]
+            role = members_stream.get_team_role(
+                context["org"], context["team_slug"], context["username"]
+            )
+            if role is not None:
+                yield role
+                return
+        yield from super().request_records(context)
+
     schema = th.PropertiesList(
         # Parent keys
         th.Property("org", th.StringType),
@@ -1,6 +1,10 @@
 """Repository Stream types classes for tap-github."""
 
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+import abc
+import json
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, cast
 from urllib.parse import parse_qs, urlparse
 
 import requests
@@ -23,12 +27,158 @@ class RepositoryStream(GitHubRestStream):
 
     # Search API max: 1,000 total.
     MAX_RESULTS_LIMIT = 1000
+    # Searches matching more than MAX_RESULTS_LIMIT repos are split into date ranges.
+    # GitHub launched in 2008, so no repository was created or pushed to before this.
+    SEARCH_SHARD_START = datetime(2007, 10, 1, tzinfo=timezone.utc)
+    # Stop bisecting below this span and accept a truncated shard.
+    SEARCH_SHARD_MIN_SPAN = timedelta(minutes=1)
+    # The /events feed of a repository is limited to its latest 300 events,
+    # and to events created within the past 30 days.
+    EVENTS_FEED_LIMIT = 300
+    EVENTS_FEED_RETENTION = timedelta(days=30)
+    _events_planner_stream: Optional[GitHubRestStream] = None
+    # With `graphql_repositories`, repositories are fetched by batches of this size.
+    GRAPHQL_BATCH_SIZE = 100
+    _graphql_stream: Optional[Any] = None
+    _repo_partitions: List[Dict[str, Any]] = []
+    _prefetched_repos: Dict[int, Optional[dict]] = {}
+    # With `graphql_repo_bundles`, the first page of small child streams is fetched
+    # for this many repositories at once. See `RepositoryBundleStream`.
+    REPO_BUNDLE_SIZE = 50
+    _upcoming_repos: List[Tuple[str, str]] = []
+    _repo_bundles: Dict[Tuple[str, str], Optional[dict]] = {}
+    # Repository ids are resolved through GraphQL by chunks of this size.
+    REPO_IDS_BATCH_SIZE = 100
+    REPO_IDS_MAX_WORKERS = 4
+    # Ids never change, but repositories may be renamed or deleted.
+    REPO_IDS_CACHE_TTL = 7 * 24 * 3600
+
+    # Repository fields of the GraphQL API, aliased to their name in the REST API.
+    # See `get_record_from_graphql` for the fields which need to be transformed.
+    # Fields deselected in the catalog are not requested, except the ones read by
+    # `get_record_from_graphql` and `get_child_context`.
+    GRAPHQL_REPOSITORY_FIELDS = """
+      node_id: id
+      id: databaseId
+      name
+      full_name: nameWithOwner
+      description
+      html_url: url
+      owner {
+        login
+        node_id: id
+        avatar_url: avatarUrl
+        html_url: url
+        type: __typename
+        ... on User { id: databaseId site_admin: isSiteAdmin }
+        ... on Organization { id: databaseId }
+      }
+      licenseInfo { key name spdx_id: spdxId }
+      defaultBranchRef { name }
+      updated_at: updatedAt
+      created_at: createdAt
+      pushed_at: pushedAt
+      ssh_url: sshUrl
+      homepage: homepageUrl
+      private: isPrivate
+      archived: isArchived
+      disabled: isDisabled
+      size: diskUsage
+      stargazers_count: stargazerCount
+      fork: isFork
+      repositoryTopics(first: 20) { nodes { topic { name } } }
+      visibility
+      primaryLanguage { name }
+      forks_count: forkCount
+      openIssues: issues(states: OPEN) { totalCount }
+      openPullRequests: pullRequests(states: OPEN) { totalCount }
+      watchers { totalCount }
+      allow_squash_merge: squashMergeAllowed
+      allow_merge_commit: mergeCommitAllowed
+      allow_rebase_merge: rebaseMergeAllowed
+      allow_auto_merge: autoMergeAllowed
+      delete_branch_on_merge: deleteBranchOnMerge
+    """
+    graphql_required_fields = [
+        ("id",),
+        ("name",),
+        ("full_name",),
+        ("html_url",),
+        ("owner", "login"),
+        ("owner", "type"),
+        ("visibility",),
+        # The values of REPO_ACTIVITY_KEYS.
+        ("forks_count",),
+        ("stargazers_count",),
+        ("openIssues",),
+        ("openPullRequests",),
+        ("pushed_at",),
+        ("updated_at",),
+    ]
+    graphql_field_properties = {
+        "owner": ["owner", "organization"],
+        "html_url": ["html_url", "clone_url", "git_url"],
+        "licenseInfo": ["license"],
+        "defaultBranchRef": ["default_branch"],
+        "repositoryTopics": ["topics"],
+        "primaryLanguage": ["language"],
+        "stargazers_count": ["stargazers_count", "watchers", "watchers_count"],
+        "forks_count": ["forks_count", "forks"],
+        "openIssues": ["open_issues", "open_issues_count"],
+        "openPullRequests": ["open_issues", "open_issues_count"],
+        "watchers": ["subscribers_count"],
+    }
+
+    # Repository fields which change when the data of its child streams changes.
+    REPO_ACTIVITY_KEYS = [
+        "pushed_at",
+        "updated_at",
+        "open_issues_count",
+        "stargazers_count",
+        "forks_count",
+        "watchers_count",
+    ]
 
     name = "repositories"
     # updated_at will be updated any time the repository object is updated,
     # e.g. when the description or the primary language of the repository is updated.
     replication_key = "updated_at"
 
+    @property
+    def missing_since_parameter(self) -> bool:  # type: ignore
+        """Navigate organization repos in descending order if incremental listing is on.
+
+        /orgs/{org}/repos has no "since" parameter but can be sorted by `updated_at`,
+        so we exit early once we reach repos which were not updated since the bookmark.
+        """
+        return "organizations" in self.config and bool(
+            self.config.get("incremental_organization_listing")
+        )
+
+    def get_listing_bookmark(self, context: Optional[Dict]) -> Optional[str]:
+        """Return the `updated_at` bookmark of the previous incremental listing."""
+        if not self.missing_since_parameter:
+            return None
+        state = self.get_context_state(context)
+        if state.get("replication_key") != self.replication_key:
+            return None
+        return state.get("replication_key_value")
+
+    @property  # type: ignore
+    def state_partitioning_keys(self) -> Optional[List[str]]:
+        """Return the context keys identifying a partition's state.
+
+        These match the partitions returned by each mode, so that extra keys
+        such as `search_shard_query` do not create new state entries.
+        """
+        if "searches" in self.config:
+            return ["search_name", "search_query"]
+        if "repositories" in self.config:
+            return ["org", "repo", "repo_id"]
+        if "organizations" in self.config:
+            return ["org"]
+        return None
+
     def get_url_params(
         self, context: Optional[Dict], next_page_token: Optional[Any]
     ) -> Dict[str, Any]:
@@ -36,8 +186,17 @@ class RepositoryStream(GitHubRestStream):
         assert context is not None, f"Context cannot be empty for '{self.name}' stream."
         params = super().get_url_params(context, next_page_token)
         if "search_query" in context:
-            # we're in search mode
-            params["q"] = context["search_query"]
+            # we're in search mode, possibly on a date range shard of the query
+            params["q"] = context.get("search_shard_query", context["search_query"])
+            if context.get("search_count_only"):
+                params["per_page"] = 1
+        elif self.missing_since_parameter:
+            # Only stop at a stored bookmark: on the first run, list all repos
+            # regardless of `start_date` so that child streams get synced.
+            params.pop("since", None)
+            bookmark = self.get_listing_bookmark(context)
+            if bookmark:
+                params["since"] = bookmark
 
         return params
 
@@ -60,63 +219,353 @@ class RepositoryStream(GitHubRestStream):
         else:
             return "$[*]"
 
-    def get_repo_ids(self, repo_list: List[Tuple[str]]) -> List[Dict[str, str]]:
-        """Enrich the list of repos with their numeric ID from github.
+    def get_search_total_count(self, context: Dict) -> int:
+        """Return the number of repositories matching the search in `context`."""
+        prepared_request = self.prepare_request(
+            {**context, "search_count_only": True}, next_page_token=None
+        )
+        decorated_request = self.request_decorator(self._request)
+        response = decorated_request(prepared_request, context)
+        self.authenticator.update_rate_limit(response.headers)
+        return int(response.json()["total_count"])
 
-        This helps maintain a stable id for context and bookmarks.
-        It uses the github graphql api to fetch the databaseId.
-        It also removes non-existant repos and corrects casing to ensure
-        data is correct downstream.
+    def get_search_shards(self, context: Dict) -> List[str]:
+        """Split a search query into queries returning at most MAX_RESULTS_LIMIT repos.
+
+        The search API stops after 1,000 results, so larger searches are bisected
+        on their `created:` range (or `pushed:` if the query already filters on
+        creation date) until every shard fits under the limit.
+        """
+        query = context["search_query"]
+        if self.get_search_total_count(context) <= self.MAX_RESULTS_LIMIT:
+            return [query]
+
+        if "created:" not in query:
+            qualifier = "created"
+        elif "pushed:" not in query:
+            qualifier = "pushed"
+        else:
+            self.logger.warning(
+                f"Search '{context['search_name']}' returns more than "
+                f"{self.MAX_RESULTS_LIMIT} results and already filters on both "
+                "'created:' and 'pushed:', results will be truncated."
+            )
+            return [query]
+
+        shards: List[str] = []
+        # ranges are processed oldest first, splitting them in half when too large.
+        ranges = [(self.SEARCH_SHARD_START, datetime.now(timezone.utc))]
+        while ranges:
+            start, end = ranges.pop()
+            shard_query = (
+                f"{query} {qualifier}:"
+                f"{start.strftime('%Y-%m-%dT%H:%M:%SZ')}.."
+                f"{end.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+            )
+            total_count = self.get_search_total_count(
+                {**context, "search_shard_query": shard_query}
+            )
+            if total_count > self.MAX_RESULTS_LIMIT:
+                if end - start > self.SEARCH_SHARD_MIN_SPAN:
+                    middle = start + (end - start) / 2
+                    middle = middle.replace(microsecond=0)
+                    ranges += [(middle, end), (start, middle)]
+                    continue
+                self.logger.warning(
+                    f"Search shard '{shard_query}' returns {total_count} results "
+                    "and cannot be split further, results will be truncated."
+                )
+            if total_count > 0:
+                shards.append(shard_query)
+
+        self.logger.info(
+            f"Split search '{context['search_name']}' into {len(shards)} shards."
+        )
+        return shards
+
+    def request_records(self, context: Optional[Dict]) -> Iterable[Dict]:
+        """Request records, running every shard of a search partition.
+
+        Shard boundaries overlap by one second, so repos are deduplicated by id.
         """
+        if context is not None and self.config.get("graphql_repositories"):
+            if "repositories" in self.config:
+                yield from self.request_batched_records(context)
+                return
+            if "organizations" in self.config:
+                yield from self.request_organization_records(context)
+                return
+        if context is None or "search_query" not in context:
+            yield from super().request_records(context)
+            return
+
+        seen_repo_ids = set()
+        for shard_query in self.get_search_shards(context):
+            shard_context = {**context, "search_shard_query": shard_query}
+            for record in super().request_records(shard_context):
+                if record["id"] in seen_repo_ids:
+                    continue
+                seen_repo_ids.add(record["id"])
+                yield record
+
+    def get_record_from_graphql(self, repo: dict) -> dict:
+        """Transform a repository of the GraphQL API into the REST format of the schema.
+
+        `network_count` and `master_branch` are not available through GraphQL.
+        """
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        owner = repo["owner"]
+        owner.setdefault("gravatar_id", "")
+        owner.setdefault("site_admin", False)
+        # Fields deselected in the catalog are not requested, see
+        # `graphql_field_properties`.
+        license_info = repo.pop("licenseInfo", None)
+        if license_info is not None:
+            license_info["url"] = f"{api_url_base}/licenses/{license_info['key']}"
+        repo["license"] = license_info
+        default_branch = repo.pop("defaultBranchRef", None)
+        repo["default_branch"] = default_branch["name"] if default_branch else None
+        topics = repo.pop("repositoryTopics", None)
+        repo["topics"] = (
+            [node["topic"]["name"] for node in topics["nodes"]] if topics else None
+        )
+        language = repo.pop("primaryLanguage", None)
+        repo["language"] = language["name"] if language else None
+        repo["visibility"] = repo["visibility"].lower()
+        host = urlparse(repo["html_url"]).netloc
+        repo["clone_url"] = f"{repo['html_url']}.git"
+        repo["git_url"] = f"git://{host}/{repo['full_name']}.git"
+        repo["forks"] = repo["forks_count"]
+        # The REST API counts stargazers as watchers, and watchers as subscribers.
+        watchers = repo.pop("watchers", None)
+        repo["subscribers_count"] = watchers["totalCount"] if watchers else None
+        repo["watchers"] = repo["watchers_count"] = repo["stargazers_count"]
+        # The REST API counts open pull requests as issues.
+        open_issues = repo.pop("openIssues", None)
+        open_pull_requests = repo.pop("openPullRequests", None)
+        repo["open_issues"] = repo["open_issues_count"] = (
+            open_issues["totalCount"] + open_pull_requests["totalCount"]
+            if open_issues and open_pull_requests
+            else None
+        )
+        if owner["type"] == "Organization":
+            repo["organization"] = owner
+        return repo
+
+    @property
+    def graphql_repository_fragment(self) -> str:
+        """Return the `repositoryFields` fragment, with the selected fields."""
+        return (
+            "fragment repositoryFields on Repository { "
+            + self.get_graphql_selection(self.GRAPHQL_REPOSITORY_FIELDS)
+            + " }"
+        )
+
+    @property
+    def graphql_stream(self) -> Any:
+        """Return a stream running the GraphQL queries of `graphql_repositories`."""
         # use a temp handmade stream to reuse all the graphql setup of the tap
         class TempStream(GitHubGraphqlStream):
             name = "tempStream"
             schema = th.PropertiesList(
-                th.Property("id", th.StringType),
-                th.Property("databaseId", th.IntegerType),
+                th.Property("id", th.IntegerType),
             ).to_dict()
-
-            def __init__(self, tap, repo_list) -> None:
-                super().__init__(tap)
-                self.repo_list = repo_list
+            graphql_query = ""
 
             @property
             def query(self) -> str:
-                chunks = list()
-                # there is probably some limit to how many items can be requested
-                # in a single query, but it's well above 1k.
-                for i, repo in enumerate(self.repo_list):
-                    chunks.append(
-                        f'repo{i}: repository(name: "{repo[1]}", owner: "{repo[0]}") '
-                        "{ nameWithOwner databaseId }"
-                    )
-                return "query {" + " ".join(chunks) + " }"
-
-        repos_with_ids: list = list()
-        temp_stream = TempStream(self._tap, list(repo_list))
+                return self.graphql_query
+
+        if self._graphql_stream is None:
+            self._graphql_stream = TempStream(self._tap)
+        return self._graphql_stream
+
+    def request_batched_records(self, context: Dict) -> Iterable[Dict]:
+        """Request the repository of this partition, along with the next ones.
+
+        Repositories are fetched by batches of GRAPHQL_BATCH_SIZE aliased queries,
+        and kept until the sync of their partition.
+        """
+        if context["repo_id"] not in self._prefetched_repos:
+            try:
+                position = self._repo_partitions.index(context)
+            except ValueError:
+                batch = [context]
+            else:
+                batch = self._repo_partitions[
+                    position : position + self.GRAPHQL_BATCH_SIZE
+                ]
+
+            chunks = [
+                f'repo{i}: repository(name: "{repo["repo"]}", owner: "{repo["org"]}") '
+                "{ ...repositoryFields }"
+                for i, repo in enumerate(batch)
+            ]
+            graphql_stream = self.graphql_stream
+            graphql_stream.query_jsonpath = "$.data.[*]"
+            graphql_stream.graphql_query = (
+                "query {" + " ".join(chunks) + " }" + self.graphql_repository_fragment
+            )
+            self._prefetched_repos = {repo["repo_id"]: None for repo in batch}
+            for record in graphql_stream.request_records({}):
+                for repo in record.values():
+                    if repo is not None:
+                        self._prefetched_repos[repo["id"]] = repo
+
+        repo = self._prefetched_repos.pop(context["repo_id"], None)
+        if repo is None:
+            self.logger.info(
+                f"Repository not found: {context['org']}/{context['repo']}"
+            )
+            return
+        yield self.get_record_from_graphql(repo)
+
+    def request_organization_records(self, context: Dict) -> Iterable[Dict]:
+        """Request the repositories of an organization, most recently updated first.
+
+        With `incremental_organization_listing`, stop at the previous bookmark.
+        """
+        graphql_stream = self.graphql_stream
+        graphql_stream.graphql_query = (
+            """
+            query organizationRepositories($org: String! $nextPageCursor_0: String) {
+              organization(login: $org) {
+                repositories(
+                  first: 100
+                  orderBy: {field: UPDATED_AT direction: DESC}
+                  after: $nextPageCursor_0
+                ) {
+                  pageInfo {
+                    hasNextPage_0: hasNextPage
+                    startCursor_0: startCursor
+                    endCursor_0: endCursor
+                  }
+                  nodes { ...repositoryFields }
+                }
+              }
+            }
+            """
+            + self.graphql_repository_fragment
+        )
+        graphql_stream.query_jsonpath = "$.data.organization.repositories.nodes.[*]"
+        bookmark = self.get_listing_bookmark(context)
+        for repo in graphql_stream.request_records({"org": context["org"]}):
+            if bookmark and parse(repo["updated_at"]) < parse(bookmark):
+                break
+            yield self.get_record_from_graphql(repo)
+
+    def get_repo_bundle(self, context: Dict) -> Optional[dict]:
+        """Return the bundled child connections of a repository, by stream name.
+
+        Bundles are requested for the next REPO_BUNDLE_SIZE repositories at once.
+        Return None if the repository was not found.
+        """
+        key = (context["org"], context["repo"])
+        if key not in self._repo_bundles:
+            try:
+                position = self._upcoming_repos.index(key)
+            except ValueError:
+                batch = [key]
+            else:
+                batch = self._upcoming_repos[
+                    position : position + self.REPO_BUNDLE_SIZE
+                ]
+            self._repo_bundles = self.request_repo_bundles(batch)
+        return self._repo_bundles.get(key)
+
+    def request_repo_bundles(
+        self, batch: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[dict]]:
+        """Request the first page of the selected bundled streams of each repository."""
+        selections = " ".join(
+            f"{child_stream.name}: {child_stream.bundle_query}"
+            for child_stream in self.child_streams
+            if isinstance(child_stream, RepositoryBundleStream)
+            and (child_stream.selected or child_stream.has_selected_descendents)
+        )
+        if not selections:
+            return {key: None for key in batch}
+        chunks = [
+            f'repo{i}: repository(name: "{repo}", owner: "{org}") {{ {selections} }}'
+            for i, (org, repo) in enumerate(batch)
+        ]
+        graphql_stream = self.graphql_stream
+        graphql_stream.query_jsonpath = "$.data.[*]"
+        graphql_stream.graphql_query = "query {" + " ".join(chunks) + " }"
+        bundles: Dict[Tuple[str, str], Optional[dict]] = {key: None for key in batch}
+        for record in graphql_stream.request_records({}):
+            for item, bundle in record.items():
+                bundles[batch[int(item[4:])]] = bundle
+        return bundles
+
+    def get_repo_ids(self, repo_list: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+        """Enrich the list of repos with their numeric ID from github.
+
+        This helps maintain a stable id for context and bookmarks.
+        It uses the github graphql api to fetch the databaseId.
+        It also removes non-existant repos and corrects casing to ensure
+        data is correct downstream.
+
+        Repos are resolved by chunks of REPO_IDS_BATCH_SIZE, sent concurrently.
+        With `local_cache_path`, resolved repos are kept for REPO_IDS_CACHE_TTL
+        so that most runs need no request at all.
+        """
+        local_store = self.local_store
+        repos_by_index: Dict[int, Dict[str, Any]] = {}
+        unresolved = []
+        for i, repo in enumerate(repo_list):
+            cached_repo = (
+                local_store.get(
+                    "repo_ids", "", "/".join(repo).lower(), self.REPO_IDS_CACHE_TTL
+                )
+                if local_store is not None
+                else None
+            )
+            if cached_repo is not None:
+                repos_by_index[i] = json.loads(cached_repo)
+            else:
+                unresolved.append(i)
+
+        fields = [
+            f'repository(name: "{repo_list[i][1]}", owner: "{repo_list[i][0]}") '
+            "{ nameWithOwner databaseId }"
+            for i in unresolved
+        ]
+        results = self.request_aliased_fields(
+            fields, "repo", self.REPO_IDS_BATCH_SIZE, self.REPO_IDS_MAX_WORKERS
+        )
         # replace manually provided org/repo values by the ones obtained
         # from github api. This guarantees that case is correct in the output data.
         # See https://github.com/MeltanoLabs/tap-github/issues/110
         # Also remove repos which do not exist to avoid crashing further down
         # the line.
-        for record in temp_stream.request_records({}):
-            for item in record.keys():
-                try:
-                    org, repo = record[item]["nameWithOwner"].split("/")
-                except TypeError:
-                    # one of the repos returned `None`, which means it does
-                    # not exist, log some details, and move on to the next one
-                    repo_full_name = "/".join(repo_list[int(item[4:])])
-                    self.logger.info(
-                        (
-                            f"Repository not found: {repo_full_name} \t"
-                            "Removing it from list"
-                        )
-                    )
-                    continue
-                repos_with_ids.append(
-                    {"org": org, "repo": repo, "repo_id": record[item]["databaseId"]}
+        for index, result in results:
+            i = unresolved[index]
+            if result is None:
+                # one of the repos returned `None`, which means it does
+                # not exist, log some details, and move on to the next one
+                self.logger.info(
+                    f"Repository not found: {'/'.join(repo_list[i])} \t"
+                    "Removing it from list"
+                )
+                continue
+            org, repo = result["nameWithOwner"].split("/")
+            repos_by_index[i] = {
+                "org": org,
+                "repo": repo,
+                "repo_id": result["databaseId"],
+            }
+            if local_store is not None:
+                local_store.set(
+                    "repo_ids",
+                    "",
+                    "/".join(repo_list[i]).lower(),
+                    json.dumps(repos_by_index[i]),
                 )
+        if local_store is not None:
+            local_store.commit()
+
+        repos_with_ids = [repos_by_index[i] for i in sorted(repos_by_index)]
         self.logger.info(f"Running the tap on {len(repos_with_ids)} repositories")
         return repos_with_ids
 
@@ -133,8 +582,16 @@ class RepositoryStream(GitHubRestStream):
                 for s in self.config["searches"]
             ]
         if "repositories" in self.config:
-            split_repo_names = map(lambda s: s.split("/"), self.config["repositories"])
-            return self.get_repo_ids(list(split_repo_names))
+            # The SDK reads the partitions before, during and after the sync.
+            if not self._repo_partitions:
+                split_repo_names = map(
+                    lambda s: s.split("/"), self.config["repositories"]
+                )
+                self._repo_partitions = self.get_repo_ids(list(split_repo_names))
+                self._upcoming_repos = [
+                    (repo["org"], repo["repo"]) for repo in self._repo_partitions
+                ]
+            return self._repo_partitions
         if "organizations" in self.config:
             return [{"org": org} for org in self.config["organizations"]]
         return None
@@ -146,11 +603,109 @@ class RepositoryStream(GitHubRestStream):
         Developers may override this behavior to send specific information to child
         streams for context.
         """
-        return {
+        child_context = {
             "org": record["owner"]["login"],
             "repo": record["name"],
             "repo_id": record["id"],
         }
+        if self.config.get("compact_state"):
+            # The compact state keys partitions by repo id, and stores names once.
+            repo_names = self.stream_state.setdefault("repo_names", {})
+            repo_names[str(record["id"])] = [record["owner"]["login"], record["name"]]
+        if self.config.get("change_gated_streams"):
+            # Child streams listed in `change_gated_streams` compare these values
+            # with the ones of their last sync to skip unchanged repositories.
+            # Mock records of `skip_parent_streams` have none of them.
+            child_context["repo_activity"] = {
+                key: record[key]
+                for key in self.REPO_ACTIVITY_KEYS
+                if record.get(key) is not None
+            }
+        if self.config.get("events_sync_planner"):
+            repo_events = self.get_repo_events(child_context)
+            if repo_events is not None:
+                child_context["repo_events"] = repo_events
+        return child_context
+
+    def get_repo_events(self, child_context: dict) -> Optional[dict]:
+        """Summarize the repository's events since its child streams were last synced.
+
+        Return the latest date of each event type, so that child streams can skip
+        their sync if none of their `activity_event_types` happened since their own
+        bookmark. `latest` is None when the events feed does not reach back far enough.
+        """
+        planned_streams = [
+            child_stream
+            for child_stream in self.child_streams
+            if getattr(child_stream, "activity_event_types", None) is not None
+            and (child_stream.selected or child_stream.has_selected_descendents)
+        ]
+        if not planned_streams:
+            return None
+
+        now = datetime.now(timezone.utc)
+        repo_events: dict = {
+            "since": None,
+            "fetched_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "latest": None,
+        }
+        bookmarks = [
+            child_stream.get_context_state(child_context).get("events_planner_bookmark")
+            for child_stream in planned_streams
+        ]
+        known_bookmarks = [parse(bookmark) for bookmark in bookmarks if bookmark]
+        if not known_bookmarks:
+            return repo_events
+        since = min(known_bookmarks) - GitHubRestStream.EVENTS_PLANNER_LAG
+        if since < now - self.EVENTS_FEED_RETENTION:
+            return repo_events
+        repo_events["since"] = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        # use a temp handmade stream to reuse the pagination and early exit of events.
+        class TempStream(EventsStream):
+            name = "tempStream"
+
+            def get_url_params(
+                self, context: Optional[Dict], next_page_token: Optional[Any]
+            ) -> Dict[str, Any]:
+                assert context is not None
+                params: dict = {
+                    "per_page": self.MAX_PER_PAGE,
+                    "direction": "desc",
+                    "since": context["since"],
+                }
+                if next_page_token:
+                    params["page"] = next_page_token
+                return params
+
+        if self._events_planner_stream is None:
+            self._events_planner_stream = TempStream(self._tap)
+
+        latest: Dict[str, str] = {}
+        events_count = 0
+        reached_since = False
+        for event in self._events_planner_stream.request_records(
+            {
+                "org": child_context["org"],
+                "repo": child_context["repo"],
+                "since": repo_events["since"],
+            }
+        ):
+            if parse(event["created_at"]) < since:
+                reached_since = True
+                break
+            events_count += 1
+            if event["created_at"] > latest.get(event["type"], ""):
+                latest[event["type"]] = event["created_at"]
+
+        if not reached_since and events_count >= self.EVENTS_FEED_LIMIT:
+            self.logger.info(
+                f"More than {self.EVENTS_FEED_LIMIT} events since {since} for "
+                f"'{child_context['org']}/{child_context['repo']}', syncing all streams."
+            )
+            return repo_events
+        repo_events["latest"] = latest
+        return repo_events
 
     def get_records(self, context: Optional[Dict]) -> Iterable[Dict[str, Any]]:
         """
@@ -177,7 +732,25 @@ class RepositoryStream(GitHubRestStream):
                 "id": context["repo_id"],
             }
         else:
-            yield from super().get_records(context)
+            bookmark = self.get_listing_bookmark(context)
+            records = (
+                record
+                for record in super().get_records(context)
+                # The last page of an incremental listing goes past the bookmark,
+                # skip these repos so that their child streams are not synced.
+                if not bookmark or parse(record["updated_at"]) >= parse(bookmark)
+            )
+            if not self.config.get("graphql_repo_bundles") or (
+                "repositories" in self.config
+            ):
+                yield from records
+                return
+            # Read repositories ahead, so that their child streams can be bundled.
+            for chunk in iter(lambda: list(islice(records, self.REPO_BUNDLE_SIZE)), []):
+                self._upcoming_repos = [
+                    (record["owner"]["login"], record["name"]) for record in chunk
+                ]
+                yield from chunk
 
     schema = th.PropertiesList(
         th.Property("search_name", th.StringType),
@@ -240,6 +813,80 @@ class RepositoryStream(GitHubRestStream):
     ).to_dict()
 
 
+class GraphqlBundleMixin(abc.ABC):
+    """Hooks of a child stream whose records can be fetched in GraphQL bundles.
+
+    When `bundle_setting` is enabled, the parent stream requests the first page
+    of the stream's connection for many parent records in a single query. Parents
+    with more than one page, or for which the query returned an error, are
+    requested through REST. Mix it in before the stream class.
+    """
+
+    name: str
+    config: Mapping[str, Any]
+    # The setting which enables bundles for this stream.
+    bundle_setting: str
+
+    @abc.abstractmethod
+    def get_bundle(self, context: dict) -> Optional[dict]:
+        """Return the bundled connections of the parent record, by stream name."""
+
+    @abc.abstractmethod
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        """Return the records of a bundled connection, in the REST format."""
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Return the bundled records of the parent record, or request them."""
+        if context is not None and self.config.get(self.bundle_setting):
+            bundle = self.get_bundle(context)
+            connection = bundle.get(self.name) if bundle else None
+            if connection is not None and not connection["pageInfo"]["hasNextPage"]:
+                yield from self.get_bundle_records(connection, context)
+                return
+        yield from super().request_records(context)  # type: ignore[misc]
+
+
+class RepositoryBundleStream(GraphqlBundleMixin, GitHubRestStream):
+    """A child stream of repositories which can be fetched in GraphQL bundles.
+
+    With `graphql_repo_bundles`, the parent stream requests the first page of
+    `bundle_query` for many repositories in a single query.
+    """
+
+    # A GraphQL connection of Repository, with `pageInfo { hasNextPage }`.
+    bundle_query = ""
+    bundle_setting = "graphql_repo_bundles"
+
+    def get_bundle(self, context: dict) -> Optional[dict]:
+        repositories_stream: RepositoryStream = cast(Any, self._tap).streams[
+            RepositoryStream.name
+        ]
+        return repositories_stream.get_repo_bundle(context)
+
+
+# User fields of the GraphQL API, aliased to their name in the REST API.
+GRAPHQL_USER_FIELDS = """
+  login
+  id: databaseId
+  node_id: id
+  avatar_url: avatarUrl
+  html_url: url
+  type: __typename
+  site_admin: isSiteAdmin
+"""
+# Fields of the Actor interface, e.g. the author of a review which may be a bot.
+GRAPHQL_ACTOR_FIELDS = """
+  login
+  avatar_url: avatarUrl
+  html_url: url
+  type: __typename
+  ... on User { id: databaseId node_id: id site_admin: isSiteAdmin }
+  ... on Bot { id: databaseId node_id: id }
+  ... on Organization { id: databaseId node_id: id }
+  ... on Mannequin { id: databaseId node_id: id }
+"""
+
+
 class ReadmeStream(GitHubRestStream):
     """
     A stream dedicated to fetching the object version of a README.md.
@@ -253,6 +900,7 @@ class ReadmeStream(GitHubRestStream):
     primary_keys = ["repo", "org"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    suppress_unchanged_records = True
     state_partitioning_keys = ["repo", "org"]
     tolerated_http_errors = [404]
 
@@ -334,6 +982,7 @@ class CommunityProfileStream(GitHubRestStream):
     primary_keys = ["repo", "org"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    suppress_unchanged_records = True
     state_partitioning_keys = ["repo", "org"]
     tolerated_http_errors = [404]
 
@@ -619,10 +1268,13 @@ class ReleasesStream(GitHubRestStream):
     name = "releases"
     path = "/repos/{org}/{repo}/releases"
     ignore_parent_replication_key = True
+    activity_event_types = ["ReleaseEvent"]
     primary_keys = ["id"]
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
     replication_key = "published_at"
+    # Releases are listed newest first, draft releases (not published yet) on top.
+    sorted_descending = True
 
     schema = th.PropertiesList(
         # Parent keys
@@ -670,13 +1322,27 @@ class ReleasesStream(GitHubRestStream):
     ).to_dict()
 
 
-class LanguagesStream(GitHubRestStream):
+class LanguagesStream(RepositoryBundleStream):
     name = "languages"
     path = "/repos/{org}/{repo}/languages"
     primary_keys = ["repo", "org", "language_name"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = False
+    suppress_unchanged_records = True
     state_partitioning_keys = ["repo", "org"]
+    bundle_query = """
+      languages(first: 100) {
+        pageInfo { hasNextPage }
+        edges { bytes: size node { language_name: name } }
+      }
+    """
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        for edge in connection["edges"]:
+            yield {
+                "language_name": edge["node"]["language_name"],
+                "bytes": edge["bytes"],
+            }
 
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the language response and reformat to return as an iterator of [{language_name: Python, bytes: 23}]."""
@@ -699,13 +1365,43 @@ class LanguagesStream(GitHubRestStream):
     ).to_dict()
 
 
-class CollaboratorsStream(GitHubRestStream):
+class CollaboratorsStream(RepositoryBundleStream):
     name = "collaborators"
     path = "/repos/{org}/{repo}/collaborators"
     primary_keys = ["id"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    suppress_unchanged_records = True
     state_partitioning_keys = ["repo", "org"]
+    # Requires push access to the repository, the connection is null otherwise.
+    bundle_query = f"""
+      collaborators(first: 100) {{
+        pageInfo {{ hasNextPage }}
+        edges {{ permission node {{ {GRAPHQL_USER_FIELDS} }} }}
+      }}
+    """
+    # Base roles, from the lowest to the highest, and the permission they add.
+    ROLE_PERMISSIONS = [
+        ("read", "pull"),
+        ("triage", "triage"),
+        ("write", "push"),
+        ("maintain", "maintain"),
+        ("admin", "admin"),
+    ]
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        roles = [role for role, _ in self.ROLE_PERMISSIONS]
+        for edge in connection["edges"]:
+            role_name = edge["permission"].lower()
+            level = roles.index(role_name) if role_name in roles else 0
+            yield {
+                **self.get_user_record(edge["node"]),
+                "permissions": {
+                    permission: i <= level
+                    for i, (_, permission) in enumerate(self.ROLE_PERMISSIONS)
+                },
+                "role_name": role_name,
+            }
 
     schema = th.PropertiesList(
         # Parent Keys
@@ -736,7 +1432,7 @@ class CollaboratorsStream(GitHubRestStream):
     ).to_dict()
 
 
-class AssigneesStream(GitHubRestStream):
+class AssigneesStream(RepositoryBundleStream):
     """Defines 'Assignees' stream which returns possible assignees for issues/prs following GitHub's API convention."""
 
     name = "assignees"
@@ -744,7 +1440,18 @@ class AssigneesStream(GitHubRestStream):
     primary_keys = ["id"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    suppress_unchanged_records = True
     state_partitioning_keys = ["repo", "org"]
+    bundle_query = f"""
+      assignableUsers(first: 100) {{
+        pageInfo {{ hasNextPage }}
+        nodes {{ {GRAPHQL_USER_FIELDS} }}
+      }}
+    """
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        for user in connection["nodes"]:
+            yield self.get_user_record(user)
 
     schema = th.PropertiesList(
         # Parent keys
@@ -773,6 +1480,13 @@ class IssuesStream(GitHubRestStream):
     replication_key = "updated_at"
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    activity_event_types = [
+        "IssuesEvent",
+        "IssueCommentEvent",
+        "PullRequestEvent",
+        "PullRequestReviewEvent",
+        "PullRequestReviewCommentEvent",
+    ]
     state_partitioning_keys = ["repo", "org"]
 
     def get_url_params(
@@ -878,9 +1592,10 @@ class IssueCommentsStream(GitHubRestStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
     ignore_parent_replication_key = True
-    # FIXME: this allows the tap to continue on server-side timeouts but means
-    # we have gaps in our data
-    tolerated_http_errors = [502]
+    activity_event_types = ["IssueCommentEvent"]
+    # Large repositories make GitHub time out on this endpoint, so we retry
+    # with smaller pages rather than skipping them.
+    adaptive_page_size = True
 
     def get_records(self, context: Optional[Dict] = None) -> Iterable[Dict[str, Any]]:
         """Return a generator of row-type dictionary objects.
@@ -939,6 +1654,10 @@ class IssueEventsStream(GitHubRestStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
     ignore_parent_replication_key = True
+    activity_event_types = [
+        "IssuesEvent",
+        "PullRequestEvent",
+    ]
     # GitHub is missing the "since" parameter on this endpoint.
     missing_since_parameter = True
 
@@ -989,6 +1708,136 @@ class CommitsStream(GitHubRestStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
     ignore_parent_replication_key = True
+    activity_event_types = ["PushEvent"]
+    _reached_known_commit = False
+    _branches_stream: Optional[GitHubRestStream] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Commits at which the current walk stops, e.g. the last synced head.
+        self._stop_at_shas: Set[str] = set()
+        # Commits seen during this sync of the partition, when walking all branches.
+        self._seen_shas: Set[str] = set()
+
+    def get_url_params(
+        self, context: Optional[Dict], next_page_token: Optional[Any]
+    ) -> Dict[str, Any]:
+        """Return a dictionary of values to be used in URL parameterization."""
+        params = super().get_url_params(context, next_page_token)
+        if context and "commits_sha" in context:
+            params["sha"] = context["commits_sha"]
+        return params
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Request the commits pushed since the last sync.
+
+        Committer dates are not monotonic, so the `since` bookmark alone may
+        re-fetch many commits. We also remember the head of the default branch and
+        stop paginating once we reach it. If the head did not change, this costs
+        a single request.
+
+        With `commits_all_branches`, other branches are then walked until they reach
+        a commit seen in this sync or in a previous one, or their previous head.
+        """
+        state = self.get_context_state(context)
+        all_branches = bool(self.config.get("commits_all_branches"))
+        self._local_store_partition = json.dumps(
+            self._get_state_partition_context(context), sort_keys=True
+        )
+        self._seen_shas = set()
+        self._stop_at_shas = {state["head_sha"]} if state.get("head_sha") else set()
+        head_sha = None
+        for record in super().request_records(context):
+            if head_sha is None:
+                head_sha = record["sha"]
+            yield record
+        if head_sha is not None:
+            state["head_sha"] = head_sha
+
+        if all_branches:
+            assert context is not None, "CommitsStream was called without context"
+            yield from self.request_branch_records(context, state)
+            local_store = self.local_store
+            if local_store is not None:
+                local_store.commit()
+        self._seen_shas = set()
+        self._stop_at_shas = set()
+
+    def request_branch_records(self, context: dict, state: dict) -> Iterable[dict]:
+        """Walk the branches whose head moved, stopping at known commits."""
+        # use a temp handmade stream to reuse the pagination of the tap.
+        class TempStream(GitHubRestStream):
+            name = "tempStream"
+            path = "/repos/{org}/{repo}/branches"
+            schema = th.PropertiesList(
+                th.Property("name", th.StringType),
+                th.Property("commit", th.ObjectType(th.Property("sha", th.StringType))),
+            ).to_dict()
+
+            def get_url_params(
+                self, context: Optional[Dict], next_page_token: Optional[Any]
+            ) -> Dict[str, Any]:
+                params: dict = {"per_page": self.MAX_PER_PAGE}
+                if next_page_token:
+                    params["page"] = next_page_token
+                return params
+
+        if self._branches_stream is None:
+            self._branches_stream = TempStream(self._tap)
+
+        previous_heads = state.get("branch_heads", {})
+        branch_heads = {}
+        # History up to the previous head of any branch was synced with that branch.
+        self._stop_at_shas = set(previous_heads.values())
+        if state.get("head_sha"):
+            self._stop_at_shas.add(state["head_sha"])
+        for branch in self._branches_stream.request_records(
+            {"org": context["org"], "repo": context["repo"]}
+        ):
+            branch_name, branch_head = branch["name"], branch["commit"]["sha"]
+            branch_heads[branch_name] = branch_head
+            if self.is_known_commit(branch_head):
+                continue
+            yield from super().request_records({**context, "commits_sha": branch_name})
+        # Only keep the heads of existing branches.
+        state["branch_heads"] = branch_heads
+
+    def is_known_commit(self, sha: str) -> bool:
+        """Return True if the walk of the current branch should stop at this commit."""
+        if sha in self._stop_at_shas or sha in self._seen_shas:
+            return True
+        local_store = self.local_store
+        if not self.config.get("commits_all_branches") or local_store is None:
+            return False
+        partition = cast(str, self._local_store_partition)
+        return local_store.get("commit_shas", partition, sha) is not None
+
+    def mark_seen_commit(self, sha: str) -> None:
+        """Remember a commit for the other branches of this sync and the next ones."""
+        self._seen_shas.add(sha)
+        local_store = self.local_store
+        if local_store is not None:
+            partition = cast(str, self._local_store_partition)
+            local_store.set("commit_shas", partition, sha, "")
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return the commits until a known one."""
+        self._reached_known_commit = False
+        for commit in super().parse_response(response):
+            if self.is_known_commit(commit["sha"]):
+                self._reached_known_commit = True
+                return
+            if self.config.get("commits_all_branches"):
+                self.mark_seen_commit(commit["sha"])
+            yield commit
+
+    def get_next_page_token(
+        self, response: requests.Response, previous_token: Optional[Any]
+    ) -> Optional[Any]:
+        """Stop paginating once we reached a known commit."""
+        if self._reached_known_commit:
+            return None
+        return super().get_next_page_token(response, previous_token)
 
     def post_process(self, row: dict, context: Optional[Dict] = None) -> dict:
         """
@@ -1064,6 +1913,9 @@ class CommitCommentsStream(GitHubRestStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
     ignore_parent_replication_key = True
+    activity_event_types = ["CommitCommentEvent"]
+    # Comments are listed by ascending id.
+    paginate_backwards = True
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1096,9 +1948,22 @@ class PullRequestsStream(GitHubRestStream):
     replication_key = "updated_at"
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    activity_event_types = [
+        "PullRequestEvent",
+        "PullRequestReviewEvent",
+        "PullRequestReviewCommentEvent",
+        "PullRequestReviewThreadEvent",
+        "PushEvent",
+    ]
     state_partitioning_keys = ["repo", "org"]
     # GitHub is missing the "since" parameter on this endpoint.
     missing_since_parameter = True
+    # With `graphql_pull_request_bundles`, the first page of reviews and commits is
+    # fetched for this many pull requests at once. See `PullRequestBundleStream`.
+    PULL_REQUEST_BUNDLE_SIZE = 50
+    _upcoming_pulls: List[Tuple[str, str, int]] = []
+    _pull_bundles: Dict[Tuple[str, str, int], Optional[dict]] = {}
+    _graphql_stream: Optional[Any] = None
 
     def get_url_params(
         self, context: Optional[Dict], next_page_token: Optional[Any]
@@ -1136,6 +2001,89 @@ class PullRequestsStream(GitHubRestStream):
             row["repo_id"] = context["repo_id"]
         return row
 
+    def get_records(self, context: Optional[Dict]) -> Iterable[Dict[str, Any]]:
+        """Read pull requests ahead, so that their child streams can be bundled."""
+        records = super().get_records(context)
+        if not self.config.get("graphql_pull_request_bundles") or context is None:
+            yield from records
+            return
+        while True:
+            chunk = list(islice(records, self.PULL_REQUEST_BUNDLE_SIZE))
+            if not chunk:
+                return
+            self._upcoming_pulls = [
+                (context["org"], context["repo"], record["number"]) for record in chunk
+            ]
+            yield from chunk
+
+    def get_pull_bundle(self, context: Dict) -> Optional[dict]:
+        """Return the bundled child connections of a pull request, by stream name.
+
+        Bundles are requested for the next PULL_REQUEST_BUNDLE_SIZE pull requests
+        at once. Return None if the pull request was not found.
+        """
+        key = (context["org"], context["repo"], context["pull_number"])
+        if key not in self._pull_bundles:
+            try:
+                position = self._upcoming_pulls.index(key)
+            except ValueError:
+                batch = [key]
+            else:
+                batch = self._upcoming_pulls[
+                    position : position + self.PULL_REQUEST_BUNDLE_SIZE
+                ]
+            self._pull_bundles = self.request_pull_bundles(batch)
+        return self._pull_bundles.get(key)
+
+    def request_pull_bundles(
+        self, batch: List[Tuple[str, str, int]]
+    ) -> Dict[Tuple[str, str, int], Optional[dict]]:
+        """Request the first page of the selected bundled streams of each pull request.
+
+        All the pull requests of a batch belong to the same repository.
+        """
+        selections = " ".join(
+            f"{child_stream.name}: {child_stream.bundle_query}"
+            for child_stream in self.child_streams
+            if isinstance(child_stream, PullRequestBundleStream)
+            and (child_stream.selected or child_stream.has_selected_descendents)
+        )
+        bundles: Dict[Tuple[str, str, int], Optional[dict]] = {
+            key: None for key in batch
+        }
+        if not selections:
+            return bundles
+
+        org, repo, _ = batch[0]
+        chunks = [
+            f"pr{i}: pullRequest(number: {number}) {{ {selections} }}"
+            for i, (_, _, number) in enumerate(batch)
+        ]
+        # use a temp handmade stream to reuse all the graphql setup of the tap
+        class TempStream(GitHubGraphqlStream):
+            name = "tempStream"
+            schema = th.PropertiesList(
+                th.Property("id", th.IntegerType),
+            ).to_dict()
+            query_jsonpath = "$.data.repository"
+            graphql_query = ""
+
+            @property
+            def query(self) -> str:
+                return self.graphql_query
+
+        if self._graphql_stream is None:
+            self._graphql_stream = TempStream(self._tap)
+        self._graphql_stream.graphql_query = (
+            f'query {{ repository(name: "{repo}", owner: "{org}") {{ '
+            + " ".join(chunks)
+            + " } }"
+        )
+        for record in self._graphql_stream.request_records({}):
+            for item, bundle in (record or {}).items():
+                bundles[batch[int(item[2:])]] = bundle
+        return bundles
+
     def get_child_context(self, record: Dict, context: Optional[Dict]) -> dict:
         if context:
             return {
@@ -1248,13 +2196,110 @@ class PullRequestsStream(GitHubRestStream):
     ).to_dict()
 
 
-class PullRequestCommits(GitHubRestStream):
+class PullRequestBundleStream(GraphqlBundleMixin, GitHubRestStream):
+    """A child stream of pull requests which can be fetched in GraphQL bundles.
+
+    With `graphql_pull_request_bundles`, the parent stream requests the first page
+    of `bundle_query` for many pull requests in a single query.
+    """
+
+    # A GraphQL connection of PullRequest, with `pageInfo { hasNextPage }`.
+    bundle_query = ""
+    bundle_setting = "graphql_pull_request_bundles"
+
+    def get_bundle(self, context: dict) -> Optional[dict]:
+        pull_requests_stream: PullRequestsStream = cast(Any, self._tap).streams[
+            PullRequestsStream.name
+        ]
+        return pull_requests_stream.get_pull_bundle(context)
+
+    def get_repo_url(self, context: dict) -> str:
+        return f"{self.url_base}/repos/{context['org']}/{context['repo']}"
+
+
+class PullRequestCommits(PullRequestBundleStream):
     name = "pull_request_commits"
     path = "/repos/{org}/{repo}/pulls/{pull_number}/commits"
     ignore_parent_replication_key = False
     primary_keys = ["node_id"]
     parent_stream_type = PullRequestsStream
     state_partitioning_keys = ["repo", "org"]
+    bundle_query = f"""
+      commits(first: 100) {{
+        pageInfo {{ hasNextPage }}
+        nodes {{
+          commit {{
+            sha: oid
+            node_id: id
+            html_url: url
+            message
+            author {{ name email date user {{ {GRAPHQL_USER_FIELDS} }} }}
+            committer {{ name email date user {{ {GRAPHQL_USER_FIELDS} }} }}
+            tree {{ oid }}
+            comments {{ totalCount }}
+            signature {{ isValid state signature payload }}
+            parents(first: 10) {{ nodes {{ oid }} }}
+          }}
+        }}
+      }}
+    """
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        repo_url = self.get_repo_url(context)
+        for node in connection["nodes"]:
+            commit = node["commit"]
+            sha = commit["sha"]
+            signature = commit["signature"]
+            people = {
+                role: (
+                    self.get_user_record(commit[role]["user"])
+                    if commit[role] and commit[role]["user"]
+                    else None
+                )
+                for role in ["author", "committer"]
+            }
+            yield {
+                "url": f"{repo_url}/commits/{sha}",
+                "sha": sha,
+                "node_id": commit["node_id"],
+                "html_url": commit["html_url"],
+                "comments_url": f"{repo_url}/commits/{sha}/comments",
+                "commit": {
+                    "url": f"{repo_url}/git/commits/{sha}",
+                    **{
+                        role: {
+                            key: commit[role][key] for key in ["name", "email", "date"]
+                        }
+                        if commit[role]
+                        else None
+                        for role in ["author", "committer"]
+                    },
+                    "message": commit["message"],
+                    "tree": {
+                        "url": f"{repo_url}/git/trees/{commit['tree']['oid']}",
+                        "sha": commit["tree"]["oid"],
+                    },
+                    "comment_count": commit["comments"]["totalCount"],
+                    "verification": {
+                        "verified": signature["isValid"],
+                        "reason": signature["state"].lower(),
+                        "signature": signature["signature"],
+                        "payload": signature["payload"],
+                    }
+                    if signature
+                    else {
+                        "verified": False,
+                        "reason": "unsigned",
+                        "signature": None,
+                        "payload": None,
+                    },
+                },
+                **people,
+                "parents": [
+                    {"url": f"{repo_url}/commits/{parent['oid']}", "sha": parent["oid"]}
+                    for parent in commit["parents"]["nodes"]
+                ],
+            }
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1321,13 +2366,48 @@ class PullRequestCommits(GitHubRestStream):
     ).to_dict()
 
 
-class ReviewsStream(GitHubRestStream):
+class ReviewsStream(PullRequestBundleStream):
     name = "reviews"
     path = "/repos/{org}/{repo}/pulls/{pull_number}/reviews"
     primary_keys = ["id"]
     parent_stream_type = PullRequestsStream
     ignore_parent_replication_key = False
     state_partitioning_keys = ["repo", "org"]
+    bundle_query = f"""
+      reviews(first: 100) {{
+        pageInfo {{ hasNextPage }}
+        nodes {{
+          id: databaseId
+          node_id: id
+          user: author {{ {GRAPHQL_ACTOR_FIELDS} }}
+          body
+          state
+          html_url: url
+          submitted_at: submittedAt
+          commit {{ oid }}
+          author_association: authorAssociation
+        }}
+      }}
+    """
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        pull_request_url = (
+            f"{self.get_repo_url(context)}/pulls/{context['pull_number']}"
+        )
+        for review in connection["nodes"]:
+            commit = review.pop("commit")
+            yield {
+                **review,
+                "user": self.get_user_record(review["user"])
+                if review["user"]
+                else None,
+                "pull_request_url": pull_request_url,
+                "_links": {
+                    "html": {"href": review["html_url"]},
+                    "pull_request": {"href": pull_request_url},
+                },
+                "commit_id": commit["oid"] if commit else None,
+            }
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1364,6 +2444,10 @@ class ReviewCommentsStream(GitHubRestStream):
     primary_keys = ["id"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    activity_event_types = [
+        "PullRequestReviewCommentEvent",
+        "PullRequestReviewThreadEvent",
+    ]
     state_partitioning_keys = ["repo", "org"]
 
     schema = th.PropertiesList(
@@ -1417,6 +2501,7 @@ class ContributorsStream(GitHubRestStream):
     primary_keys = ["node_id", "repo", "org"]
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
+    suppress_unchanged_records = True
     state_partitioning_keys = ["repo", "org"]
 
     schema = th.PropertiesList(
@@ -1484,6 +2569,7 @@ class StargazersStream(GitHubRestStream):
     primary_keys = ["user_id", "repo", "org"]
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
+    activity_event_types = ["WatchEvent"]
     replication_key = "starred_at"
     # GitHub is missing the "since" parameter on this endpoint.
     missing_since_parameter = True
@@ -1538,6 +2624,10 @@ class StargazersGraphqlStream(GitHubGraphqlStream):
     state_partitioning_keys = ["repo_id"]
     # The parent repository object changes if the number of stargazers changes.
     ignore_parent_replication_key = False
+    activity_event_types = ["WatchEvent"]
+    adaptive_page_size = True
+    page_size_variables = {"pageSize_0": 100}
+    graphql_required_fields = [("user", "id")]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1587,31 +2677,40 @@ class StargazersGraphqlStream(GitHubGraphqlStream):
     def query(self) -> str:
         """Return dynamic GraphQL query."""
         # Graphql id is equivalent to REST node_id. To keep the tap consistent, we rename "id" to "node_id".
-        return """
-          query repositoryStargazers($repo: String! $org: String! $nextPageCursor_0: String) {
+        edge_fields = self.get_graphql_selection(
+            """
+            user: node {
+              node_id: id
+              id: databaseId
+              login
+              avatar_url: avatarUrl
+              html_url: url
+              type: __typename
+              site_admin: isSiteAdmin
+            }
+            starred_at: starredAt
+            """
+        )
+        return (
+            """
+          query repositoryStargazers($repo: String! $org: String! $nextPageCursor_0: String $pageSize_0: Int!) {
             repository(name: $repo owner: $org) { 
-              stargazers(first: 100 orderBy: {field: STARRED_AT direction: DESC} after: $nextPageCursor_0) {
+              stargazers(first: $pageSize_0 orderBy: {field: STARRED_AT direction: DESC} after: $nextPageCursor_0) {
                 pageInfo {
                   hasNextPage_0: hasNextPage
                   startCursor_0: startCursor
                   endCursor_0: endCursor
                 }
                 edges {
-                  user: node {
-                    node_id: id
-                    id: databaseId
-                    login
-                    avatar_url: avatarUrl
-                    html_url: url
-                    type: __typename
-                    site_admin: isSiteAdmin
-                  }
-                  starred_at: starredAt
+            """
+            + edge_fields
+            + """
                 }
               }
             }
           }
         """
+        )
 
     schema = th.PropertiesList(
         # Parent Keys
@@ -1634,6 +2733,8 @@ class StatsContributorsStream(GitHubRestStream):
     name = "stats_contributors"
     path = "/repos/{org}/{repo}/stats/contributors"
     primary_keys = ["user_id", "week_start", "repo", "org"]
+    # week_start is a unix timestamp for the Sunday (00:00 UTC) starting the week.
+    replication_key = "week_start"
     parent_stream_type = RepositoryStream
     ignore_parent_replication_key = True
     state_partitioning_keys = ["repo", "org"]
@@ -1641,6 +2742,38 @@ class StatsContributorsStream(GitHubRestStream):
     # has not been cached recently. https://docs.github.com/en/rest/reference/metrics#a-word-about-caching
     tolerated_http_errors = [202]
 
+    # The unix epoch was a Thursday, the following Sunday is 3 days later.
+    FIRST_WEEK_START = 3 * 24 * 3600
+    WEEK_DURATION = 7 * 24 * 3600
+
+    def get_url_params(
+        self, context: Optional[Dict], next_page_token: Optional[Any]
+    ) -> Dict[str, Any]:
+        """This endpoint takes no parameters, weeks are filtered in `get_records`."""
+        return {}
+
+    def get_starting_week(self, context: Optional[Dict]) -> Optional[int]:
+        """Return the first week to sync for this repository.
+
+        This is the bookmarked week, which may have been incomplete on the last run,
+        or the week containing `start_date` if the repository was never synced.
+        """
+        starting_value = self.get_starting_replication_key_value(context)
+        if not isinstance(starting_value, str):
+            return starting_value
+        start_date = parse(starting_value)
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=timezone.utc)
+        timestamp = int(start_date.timestamp())
+        return timestamp - (timestamp - self.FIRST_WEEK_START) % self.WEEK_DURATION
+
+    def get_records(self, context: Optional[Dict] = None) -> Iterable[Dict[str, Any]]:
+        """Return the weeks starting at or after the repository's bookmark."""
+        starting_week = self.get_starting_week(context)
+        for record in super().get_records(context):
+            if starting_week is None or record["week_start"] >= starting_week:
+                yield record
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of flattened contributor activity."""
         replacement_keys = {
@@ -1694,6 +2827,109 @@ class ProjectsStream(GitHubRestStream):
     primary_keys = ["id"]
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo", "org"]
+    # With `graphql_projects`, the columns and cards of the projects are fetched
+    # along with them, and kept by stream name and parent id until their sync.
+    _nested_connections: Dict[Tuple[str, int], dict] = {}
+    _graphql_stream: Optional[GitHubGraphqlStream] = None
+
+    def request_records(self, context: Optional[Dict]) -> Iterable[Dict]:
+        """Request the projects of the repository, with their columns and cards."""
+        if context is None or not self.config.get("graphql_projects"):
+            yield from super().request_records(context)
+            return
+
+        # use a temp handmade stream to reuse the pagination of the tap
+        class TempStream(GitHubGraphqlStream):
+            name = "tempStream"
+            schema = th.PropertiesList(
+                th.Property("id", th.IntegerType),
+            ).to_dict()
+            query_jsonpath = "$.data.repository.projects.nodes.[*]"
+            query = f"""
+              query repositoryProjects(
+                $repo: String! $org: String! $nextPageCursor_0: String
+              ) {{
+                repository(name: $repo owner: $org) {{
+                  projects(first: 20 after: $nextPageCursor_0) {{
+                    pageInfo {{
+                      hasNextPage_0: hasNextPage
+                      startCursor_0: startCursor
+                      endCursor_0: endCursor
+                    }}
+                    nodes {{
+                      id: databaseId
+                      node_id: id
+                      name
+                      body
+                      number
+                      state
+                      html_url: url
+                      creator {{ {GRAPHQL_ACTOR_FIELDS} }}
+                      created_at: createdAt
+                      updated_at: updatedAt
+                      columns(first: 50) {{
+                        pageInfo {{ hasNextPage }}
+                        nodes {{
+                          id: databaseId
+                          node_id: id
+                          name
+                          created_at: createdAt
+                          updated_at: updatedAt
+                          cards(first: 50 archivedStates: [ARCHIVED, NOT_ARCHIVED]) {{
+                            pageInfo {{ hasNextPage }}
+                            nodes {{
+                              id: databaseId
+                              node_id: id
+                              note
+                              creator {{ {GRAPHQL_ACTOR_FIELDS} }}
+                              created_at: createdAt
+                              updated_at: updatedAt
+                              archived: isArchived
+                              content {{
+                                ... on Issue {{ number repository {{ nameWithOwner }} }}
+                                ... on PullRequest {{
+                                  number repository {{ nameWithOwner }}
+                                }}
+                              }}
+                            }}
+                          }}
+                        }}
+                      }}
+                    }}
+                  }}
+                }}
+              }}
+            """
+
+        if self._graphql_stream is None:
+            self._graphql_stream = TempStream(self._tap)
+        self._nested_connections = {}
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        for project in self._graphql_stream.request_records(
+            {"org": context["org"], "repo": context["repo"]}
+        ):
+            columns = project.pop("columns")
+            self._nested_connections[("project_columns", project["id"])] = columns
+            for column in columns["nodes"]:
+                cards = column.pop("cards")
+                cards["project_id"] = project["id"]
+                self._nested_connections[("project_cards", column["id"])] = cards
+
+            project_url = f"{api_url_base}/projects/{project['id']}"
+            yield {
+                **project,
+                "owner_url": f"{api_url_base}/repos/{context['org']}/{context['repo']}",
+                "url": project_url,
+                "columns_url": f"{project_url}/columns",
+                "state": project["state"].lower(),
+                "creator": self.get_user_record(project["creator"])
+                if project["creator"]
+                else None,
+            }
+
+    def get_nested_connection(self, stream_name: str, parent_id: int) -> Optional[dict]:
+        """Return the connection of a child stream fetched with the projects."""
+        return self._nested_connections.pop((stream_name, parent_id), None)
 
     def get_child_context(self, record: Dict, context: Optional[Dict]) -> dict:
         return {
@@ -1725,7 +2961,7 @@ class ProjectsStream(GitHubRestStream):
     ).to_dict()
 
 
-class ProjectColumnsStream(GitHubRestStream):
+class ProjectColumnsStream(GraphqlBundleMixin, GitHubRestStream):
     name = "project_columns"
     path = "/projects/{project_id}/columns"
     ignore_parent_replication_key = True
@@ -1733,6 +2969,28 @@ class ProjectColumnsStream(GitHubRestStream):
     primary_keys = ["id"]
     parent_stream_type = ProjectsStream
     state_partitioning_keys = ["project_id", "repo", "org"]
+    bundle_setting = "graphql_projects"
+
+    def get_bundle(self, context: dict) -> Optional[dict]:
+        projects_stream: ProjectsStream = cast(Any, self._tap).streams[
+            ProjectsStream.name
+        ]
+        return {
+            self.name: projects_stream.get_nested_connection(
+                self.name, context["project_id"]
+            )
+        }
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        for column in connection["nodes"]:
+            column_url = f"{api_url_base}/projects/columns/{column['id']}"
+            yield {
+                **column,
+                "url": column_url,
+                "project_url": f"{api_url_base}/projects/{context['project_id']}",
+                "cards_url": f"{column_url}/cards",
+            }
 
     def get_child_context(self, record: Dict, context: Optional[Dict]) -> dict:
         return {
@@ -1760,7 +3018,7 @@ class ProjectColumnsStream(GitHubRestStream):
     ).to_dict()
 
 
-class ProjectCardsStream(GitHubRestStream):
+class ProjectCardsStream(GraphqlBundleMixin, GitHubRestStream):
     name = "project_cards"
     path = "/projects/columns/{column_id}/cards"
     ignore_parent_replication_key = True
@@ -1768,6 +3026,38 @@ class ProjectCardsStream(GitHubRestStream):
     primary_keys = ["id"]
     parent_stream_type = ProjectColumnsStream
     state_partitioning_keys = ["project_id", "repo", "org"]
+    bundle_setting = "graphql_projects"
+
+    def get_bundle(self, context: dict) -> Optional[dict]:
+        projects_stream: ProjectsStream = cast(Any, self._tap).streams[
+            ProjectsStream.name
+        ]
+        return {
+            self.name: projects_stream.get_nested_connection(
+                self.name, context["column_id"]
+            )
+        }
+
+    def get_bundle_records(self, connection: dict, context: dict) -> Iterable[dict]:
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        for card in connection["nodes"]:
+            content = card.pop("content")
+            yield {
+                **card,
+                "url": f"{api_url_base}/projects/columns/cards/{card['id']}",
+                "creator": self.get_user_record(card["creator"])
+                if card["creator"]
+                else None,
+                "column_url": f"{api_url_base}/projects/columns/{context['column_id']}",
+                # Issues and pull requests are both linked through their issue.
+                "content_url": (
+                    f"{api_url_base}/repos/{content['repository']['nameWithOwner']}"
+                    f"/issues/{content['number']}"
+                )
+                if content
+                else None,
+                "project_url": f"{api_url_base}/projects/{connection['project_id']}",
+            }
 
     schema = th.PropertiesList(
         # Parent Keys
@@ -1839,6 +3129,14 @@ class WorkflowRunsStream(GitHubRestStream):
     ignore_parent_replication_key = False
     state_partitioning_keys = ["repo", "org"]
     records_jsonpath = "$.workflow_runs[*]"
+    # /actions/runs has no "since" parameter but filters on `created`. Runs are
+    # updated after their creation, e.g. when they complete, so look back further.
+    created_lookback = timedelta(days=1)
+    # GitHub returns at most 1,000 runs when filtering.
+    MAX_FILTERED_RESULTS = 1000
+    _created_floor: Optional[datetime] = None
+    _filter_by_created = True
+    _filtered_results_truncated = False
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1852,6 +3150,7 @@ class WorkflowRunsStream(GitHubRestStream):
         th.Property("head_branch", th.StringType),
         th.Property("head_sha", th.StringType),
         th.Property("run_number", th.IntegerType),
+        th.Property("run_attempt", th.IntegerType),
         th.Property("event", th.StringType),
         th.Property("status", th.StringType),
         th.Property("conclusion", th.StringType),
@@ -1878,9 +3177,75 @@ class WorkflowRunsStream(GitHubRestStream):
         th.Property("workflow_url", th.StringType),
     ).to_dict()
 
+    def get_created_floor(self, context: Optional[dict]) -> Optional[datetime]:
+        """Return the creation date of the oldest runs which may have been updated."""
+        since = self.get_starting_timestamp(context)
+        return since - self.created_lookback if since else None
+
+    @property
+    def is_filtered_by_created(self) -> bool:
+        """Return True if runs are requested with a `created` filter."""
+        return self._created_floor is not None and self._filter_by_created
+
+    def get_url_params(
+        self, context: Optional[Dict], next_page_token: Optional[Any]
+    ) -> Dict[str, Any]:
+        """Return a dictionary of values to be used in URL parameterization.
+
+        Runs are returned by descending creation date, which is the only order.
+        """
+        params: dict = {"per_page": self.MAX_PER_PAGE}
+        if next_page_token:
+            params["page"] = next_page_token
+        if self._created_floor and self.is_filtered_by_created:
+            created = self._created_floor.strftime("%Y-%m-%dT%H:%M:%SZ")
+            params["created"] = f">={created}"
+        return params
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Request the runs created since the bookmark.
+
+        If there are too many runs to filter them, e.g. on the first sync, walk
+        all runs instead, until they were created before the bookmark.
+        """
+        self._created_floor = self.get_created_floor(context)
+        self._filter_by_created = True
+        self._filtered_results_truncated = False
+        yield from super().request_records(context)
+        if self._filtered_results_truncated:
+            self.logger.info(
+                f"More than {self.MAX_FILTERED_RESULTS} runs to filter, "
+                "paginating through all runs instead."
+            )
+            self._filter_by_created = False
+            yield from super().request_records(context)
+            self._filter_by_created = True
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        resp_json = response.json()
+        if (
+            self.is_filtered_by_created
+            and resp_json.get("total_count", 0) > self.MAX_FILTERED_RESULTS
+        ):
+            self._filtered_results_truncated = True
+            return
+        yield from extract_jsonpath(self.records_jsonpath, input=resp_json)
+
+    def get_next_page_token(
+        self, response: requests.Response, previous_token: Optional[Any]
+    ) -> Optional[Any]:
+        """Exit early once runs were created before the bookmark."""
+        if self._filtered_results_truncated and self.is_filtered_by_created:
+            return None
+        if "next" not in response.links.keys():
+            return None
+        runs = response.json().get("workflow_runs")
+        if not runs:
+            return None
+        if self._created_floor and parse(runs[-1]["created_at"]) < self._created_floor:
+            return None
+        return (previous_token or 1) + 1
 
     def get_child_context(self, record: dict, context: Optional[dict]) -> dict:
         """Return a child context object from the record and optional provided context.
@@ -1892,6 +3257,8 @@ class WorkflowRunsStream(GitHubRestStream):
             "org": context["org"] if context else None,
             "repo": context["repo"] if context else None,
             "run_id": record["id"],
+            "run_status": record.get("status"),
+            "run_attempt": record.get("run_attempt"),
             "repo_id": context["repo_id"] if context else None,
         }
 
@@ -1952,6 +3319,50 @@ class WorkflowRunJobsStream(GitHubRestStream):
         super().__init__(*args, **kwargs)
         self._schema_emitted = False
 
+    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+        """Return the jobs of a run, unless they were fetched after it completed.
+
+        The jobs of a completed run never change. With `local_cache_path`, the
+        latest attempt of each run whose jobs were fetched once completed is kept,
+        and they are only requested again if the run is re-attempted.
+        """
+        if self.is_completed_run_cached(context):
+            self.logger.debug("Jobs already fetched. Skipping completed run.")
+            return
+        yield from super().get_records(context)
+
+        local_store = self.local_store
+        if (
+            local_store is not None
+            and context
+            and context.get("run_status") == "completed"
+        ):
+            local_store.set(
+                self.name,
+                self.get_run_cache_partition(context),
+                str(context["run_id"]),
+                str(context["run_attempt"]),
+            )
+            local_store.commit()
+
+    @staticmethod
+    def get_run_cache_partition(context: dict) -> str:
+        return json.dumps({"org": context["org"], "repo": context["repo"]})
+
+    def is_completed_run_cached(self, context: Optional[dict]) -> bool:
+        """Return True if the jobs of this attempt were fetched once it completed."""
+        local_store = self.local_store
+        if (
+            local_store is None
+            or not context
+            or context.get("run_status") != "completed"
+        ):
+            return False
+        cached_attempt = local_store.get(
+            self.name, self.get_run_cache_partition(context), str(context["run_id"])
+        )
+        return cached_attempt == str(context["run_attempt"])
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
         yield from extract_jsonpath(self.records_jsonpath, input=response.json())
@@ -2036,6 +3447,11 @@ class DependenciesStream(GitHubGraphqlStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys = ["repo_id"]
     ignore_parent_replication_key = True
+    # Only the number of manifests per page is adjusted: the dependencies of a
+    # manifest are paginated with cursors of pages of 50.
+    adaptive_page_size = True
+    page_size_variables = {"pageSize_0": 10}
+    graphql_required_fields = [("dependency", "id")]
 
     @property
     def http_headers(self) -> dict:
@@ -2062,10 +3478,29 @@ class DependenciesStream(GitHubGraphqlStream):
     def query(self) -> str:
         """Return dynamic GraphQL query."""
         # Graphql id is equivalent to REST node_id. To keep the tap consistent, we rename "id" to "node_id".
-        return """
-          query repositoryDependencies($repo: String! $org: String! $nextPageCursor_0: String $nextPageCursor_1: String) {
+        dependency_fields = self.get_graphql_selection(
+            """
+            dependency: repository {
+              node_id: id
+              id: databaseId
+              name_with_owner: nameWithOwner
+              url
+              owner {
+                node_id: id
+                login
+              }
+            }
+            package_manager: packageManager
+            package_name: packageName
+            requirements
+            has_dependencies: hasDependencies
+            """
+        )
+        return (
+            """
+          query repositoryDependencies($repo: String! $org: String! $nextPageCursor_0: String $nextPageCursor_1: String $pageSize_0: Int!) {
             repository(name: $repo owner: $org) {
-              dependencyGraphManifests (first: 10 withDependencies: true after: $nextPageCursor_0) {
+              dependencyGraphManifests (first: $pageSize_0 withDependencies: true after: $nextPageCursor_0) {
                 totalCount
                 pageInfo {
                   hasNextPage_0: hasNextPage
@@ -2082,28 +3517,17 @@ class DependenciesStream(GitHubGraphqlStream):
                       endCursor_1: endCursor
                     }
                     nodes {
-                      dependency: repository {
-                        node_id: id
-                        id: databaseId
-                        name_with_owner: nameWithOwner
-                        url
-                        owner {
-                          node_id: id
-                          login
-                        }
-                      }
-                      package_manager: packageManager
-                      package_name: packageName
-                      requirements
-                      has_dependencies: hasDependencies
+            """
+            + dependency_fields
+            + """
                     }
                   }
                 }
               }
             }
           }
-
         """
+        )
 
     schema = th.PropertiesList(
         # Parent Keys
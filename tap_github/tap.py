@@ -2,13 +2,14 @@
 
 import logging
 import os
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from singer_sdk import Stream, Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
 from singer_sdk.helpers._classproperty import classproperty
 
 from tap_github.streams import Streams
+from tap_github.utils.state import StateWriter, expand_state, merge_state
 
 
 class TapGitHub(Tap):
@@ -67,6 +68,152 @@ class TapGitHub(Tap):
         th.Property("start_date", th.DateTimeType),
         th.Property("stream_maps", th.ObjectType()),
         th.Property("stream_map_config", th.ObjectType()),
+        th.Property(
+            "incremental_organization_listing",
+            th.BooleanType,
+            description=(
+                "Set to true to list organization repositories by descending "
+                "`updated_at` and stop at the previous run's bookmark. Child streams "
+                "are then only synced for repositories updated since that run."
+            ),
+        ),
+        th.Property(
+            "graphql_repositories",
+            th.BooleanType,
+            description=(
+                "Set to true to fetch `repositories` through the GraphQL API: by "
+                "batches of 100 repositories per request in `repositories` mode, and "
+                "100 per page in `organizations` mode. `network_count` and "
+                "`master_branch` are then left empty."
+            ),
+        ),
+        th.Property(
+            "graphql_repo_bundles",
+            th.BooleanType,
+            description=(
+                "Set to true to fetch `languages`, `assignees` and `collaborators` "
+                "through GraphQL, for 50 repositories per request. Repositories with "
+                "more than 100 records in a stream are requested through REST."
+            ),
+        ),
+        th.Property(
+            "graphql_pull_request_bundles",
+            th.BooleanType,
+            description=(
+                "Set to true to fetch `reviews` and `pull_request_commits` through "
+                "GraphQL, for 50 pull requests per request. Pull requests with more "
+                "than 100 records in a stream are requested through REST."
+            ),
+        ),
+        th.Property(
+            "graphql_projects",
+            th.BooleanType,
+            description=(
+                "Set to true to fetch `projects` with their `project_columns` and "
+                "`project_cards` in one GraphQL query per page of 20 projects. "
+                "Projects with more than 50 columns, and columns with more than 50 "
+                "cards, are completed through REST."
+            ),
+        ),
+        th.Property(
+            "graphql_team_memberships",
+            th.BooleanType,
+            description=(
+                "Set to true to fetch `team_members` and `team_roles` through "
+                "GraphQL, with the members of 20 teams per query, instead of one "
+                "REST request per team and one per member of each team."
+            ),
+        ),
+        th.Property(
+            "change_gated_streams",
+            th.ArrayType(th.StringType),
+            description=(
+                "Child streams of `repositories` which are only synced when the "
+                "repository's `pushed_at`, `updated_at` or counters (open issues, "
+                "stars, forks, watchers) changed since their last sync."
+            ),
+        ),
+        th.Property(
+            "events_sync_planner",
+            th.BooleanType,
+            description=(
+                "Set to true to read each repository's events feed before syncing "
+                "its child streams, and skip the child streams (e.g. releases, "
+                "issue_comments) which had no matching events since their last sync."
+            ),
+        ),
+        th.Property(
+            "local_cache_path",
+            th.StringType,
+            description=(
+                "Path to a local sqlite file where the tap keeps data between runs, "
+                "such as record fingerprints. It is bounded in size and entries "
+                "expire after 30 days. The jobs of completed workflow runs are "
+                "not requested again unless the run is re-attempted, and the ids of "
+                "`repositories` and `users` are kept for 7 days."
+            ),
+        ),
+        th.Property(
+            "suppress_unchanged_records",
+            th.BooleanType,
+            description=(
+                "Set to true to skip the records of full-table streams (e.g. "
+                "languages, collaborators) which did not change since the last run. "
+                "Requires `local_cache_path`."
+            ),
+        ),
+        th.Property(
+            "min_refresh_intervals",
+            th.ObjectType(additional_properties=th.IntegerType),
+            description=(
+                "Minimum number of seconds between two syncs of each partition, "
+                'by stream name, e.g. `{"languages": 86400}`. Partitions synced '
+                "more recently are skipped."
+            ),
+        ),
+        th.Property(
+            "commits_all_branches",
+            th.BooleanType,
+            description=(
+                "Set to true to sync the commits of all branches instead of only "
+                "the default branch. Each branch is walked until it reaches a commit "
+                "which was already synced. Works best with `local_cache_path`."
+            ),
+        ),
+        th.Property(
+            "compact_state",
+            th.BooleanType,
+            description=(
+                "Set to true to write a compact state, where the partitions of each "
+                "repository are keyed by its id and empty bookmarks are omitted. "
+                "Both formats are read regardless of this setting."
+            ),
+        ),
+        th.Property(
+            "state_message_interval",
+            th.IntegerType,
+            description=(
+                "Minimum number of seconds between two STATE messages. By default, "
+                "a STATE message is written after the sync of each partition."
+            ),
+        ),
+        th.Property(
+            "state_message_records",
+            th.IntegerType,
+            description=(
+                "Write a STATE message once this many records were written, "
+                "instead of after the sync of each partition."
+            ),
+        ),
+        th.Property(
+            "delta_state_messages",
+            th.BooleanType,
+            description=(
+                "Set to true to only include the bookmarks which changed since "
+                "the previous STATE message. Each top-level stream sync still ends "
+                "with a full STATE message, and every 100th message is full."
+            ),
+        ),
         th.Property(
             "skip_parent_streams",
             th.BooleanType,
@@ -77,6 +224,30 @@ class TapGitHub(Tap):
         ),
     ).to_dict()
 
+    _state_writer: Optional[StateWriter] = None
+
+    @property
+    def state_writer(self) -> StateWriter:
+        """Return the writer of STATE messages, shared by all streams."""
+        if self._state_writer is None:
+            self._state_writer = StateWriter(dict(self.config))
+        return self._state_writer
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Load the state, expanding it first if it was written by `compact_state`.
+
+        A lone delta STATE message is loaded as a state holding only its bookmarks.
+        """
+        if state.get("delta"):
+            self.logger.warning(
+                "This state is a delta STATE message. Streams and partitions "
+                "missing from it will be synced from the start. Merge it with the "
+                "previous full state with `tap_github.utils.state.merge_state` to "
+                "resume from all the bookmarks."
+            )
+            state = merge_state({}, state)
+        super().load_state(expand_state(state))
+
     def discover_streams(self) -> List[Stream]:
         """Return a list of discovered streams for each query."""
 
@@ -1,9 +1,12 @@
 import datetime
+import json
 import logging
 import os
 import sys
+from typing import Any, Dict, Optional
 
 import pytest
+import requests
 
 from ..utils.filter_stdout import FilterStdOutput
 
@@ -11,6 +14,26 @@ from ..utils.filter_stdout import FilterStdOutput
 sys.stdout = FilterStdOutput(sys.stdout, r'{"type": ')  # type: ignore
 
 
+def fake_response(
+    prepared_request: requests.PreparedRequest,
+    content: Any,
+    links: Optional[Dict[str, str]] = None,
+) -> requests.Response:
+    """Build a successful response to `prepared_request`, with a JSON body.
+
+    `links` maps relations of the Link header, e.g. "next", to their URL.
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(content).encode()
+    response.request = prepared_request
+    if links:
+        response.headers["Link"] = ", ".join(
+            f'<{url}>; rel="{rel}"' for rel, url in links.items()
+        )
+    return response
+
+
 @pytest.fixture
 def search_config():
     return {
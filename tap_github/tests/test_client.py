@@ -0,0 +1,293 @@
+"""Tests for the base stream classes which do not need API access."""
+import json
+from urllib.parse import parse_qs, urlparse
+
+from tap_github.client import ServerTimeoutError
+from tap_github.repository_streams import StargazersGraphqlStream
+from tap_github.tap import TapGitHub
+from tap_github.utils.local_store import LocalStore
+
+from .fixtures import fake_response, repo_list_config
+
+
+def fake_paginated_api(total_records: int, max_page_size: int):
+    """Build a fake `_request` serving `total_records` issue comments.
+
+    Pages larger than `max_page_size` time out like GitHub does on big repos.
+    """
+
+    def _request(prepared_request, context):
+        query = parse_qs(urlparse(prepared_request.url).query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query["per_page"][0])
+        if per_page > max_page_size:
+            raise ServerTimeoutError("502 Server Error")
+
+        first = (page - 1) * per_page
+        records = [
+            {"id": i, "updated_at": "2022-01-01T00:00:00Z"}
+            for i in range(first, min(first + per_page, total_records))
+        ]
+        links = {}
+        if first + per_page < total_records:
+            links[
+                "next"
+            ] = f"https://api.github.com/x?per_page={per_page}&page={page + 1}"
+        return fake_response(prepared_request, records, links)
+
+    return _request
+
+
+def test_adaptive_page_size_recovers_all_records(repo_list_config):
+    repo_list_config.pop("start_date")
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["issue_comments"]
+    stream._request = fake_paginated_api(total_records=180, max_page_size=25)
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+
+    records = list(stream.request_records(context))
+
+    assert [record["id"] for record in records] == list(range(180))
+
+
+def fake_dependencies_api(manifest_counts: dict, max_page_size: int):
+    """Build a fake `_request` serving the dependency manifests of repositories.
+
+    Each manifest has one dependency. Pages of more than `max_page_size` manifests
+    time out, and queries cost a point per 100 requested nodes like on GitHub.
+    """
+
+    def _request(prepared_request, context):
+        body = json.loads(prepared_request.body)
+        assert "rateLimit { cost remaining resetAt }" in body["query"]
+        variables = body["variables"]
+        page_size = variables["pageSize_0"]
+        if page_size > max_page_size:
+            raise ServerTimeoutError("502 Server Error")
+
+        total = manifest_counts[variables["repo"]]
+        first = int(variables.get("nextPageCursor_0") or 0)
+        last = min(first + page_size, total)
+        manifests = {
+            "pageInfo": {"hasNextPage_0": last < total, "endCursor_0": str(last)},
+            "nodes": [
+                {
+                    "dependencies": {
+                        "pageInfo": {"hasNextPage_1": False},
+                        "nodes": [{"dependency": {"id": i}}],
+                    }
+                }
+                for i in range(first, last)
+            ],
+        }
+        data = {
+            "rateLimit": {"cost": max(1, -(-page_size * 51 // 100))},
+            "repository": {"dependencyGraphManifests": manifests},
+        }
+        return fake_response(prepared_request, {"data": data})
+
+    return _request
+
+
+def test_graphql_page_size_adapts_to_timeouts_and_cost(repo_list_config):
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["dependencies"]
+    manifest_counts = {"large": 12, "small": 1}
+    stream._request = fake_dependencies_api(manifest_counts, max_page_size=5)
+
+    context = {"org": "MeltanoLabs", "repo": "large", "repo_id": 1}
+    records = list(stream.request_records(context))
+    assert [record["dependency"]["id"] for record in records] == list(range(12))
+
+    # Single pages of small repositories shrink until they cost a single point.
+    page_sizes = []
+    for _ in range(3):
+        context = {"org": "MeltanoLabs", "repo": "small", "repo_id": 2}
+        assert len(list(stream.request_records(context))) == 1
+        page_sizes.append(stream.get_page_sizes()["pageSize_0"])
+    assert page_sizes == [2, 1, 1]
+
+
+def test_graphql_selection_follows_the_catalog(repo_list_config):
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["dependencies"]
+    for property_name in ["dependency", "requirements"]:
+        stream.metadata[("properties", property_name)].selected = False
+    query = " ".join(stream.query.split())
+    # The id of the dependency is kept for the `dependency_repo_id` primary key.
+    assert "dependency : repository { id : databaseId }" in query
+    assert "requirements" not in query
+    assert "package_name : packageName" in query
+
+    stream = tap.streams["repositories"]
+    for property_name in ["description", "watchers", "owner", "organization"]:
+        stream.metadata[("properties", property_name)].selected = False
+    fragment = stream.graphql_repository_fragment
+    assert "description" not in fragment
+    assert "avatarUrl" not in fragment
+    assert "owner { login type : __typename }" in fragment
+    assert "watchers { totalCount }" in fragment
+
+
+def test_change_gated_stream_skips_unchanged_repos(repo_list_config):
+    repo_list_config["change_gated_streams"] = ["assignees"]
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["assignees"]
+    stream.request_records = lambda context: iter([{"id": 1}])
+    activity = {"pushed_at": "2022-06-01T00:00:00Z", "open_issues_count": 3}
+    context = {
+        "org": "MeltanoLabs",
+        "repo": "tap-github",
+        "repo_id": 1,
+        "repo_activity": activity,
+    }
+
+    assert len(list(stream.get_records(context))) == 1
+    assert stream.get_context_state(context)["repo_activity"] == activity
+    assert list(stream.get_records(context)) == []
+
+    context["repo_activity"] = {**activity, "open_issues_count": 4}
+    assert len(list(stream.get_records(context))) == 1
+
+
+def test_events_planner_skips_inactive_streams(repo_list_config):
+    state = {
+        "bookmarks": {
+            "releases": {
+                "partitions": [
+                    {
+                        "context": {"org": "MeltanoLabs", "repo": "tap-github"},
+                        "events_planner_bookmark": "2022-06-01T00:00:00Z",
+                    }
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=repo_list_config, state=state)
+    stream = tap.streams["releases"]
+    context = {
+        "org": "MeltanoLabs",
+        "repo": "tap-github",
+        "repo_id": 1,
+        "repo_events": {
+            "since": "2022-05-31T18:00:00Z",
+            "fetched_at": "2022-06-02T00:00:00Z",
+            "latest": {"WatchEvent": "2022-06-01T12:00:00Z"},
+        },
+    }
+    assert stream.is_repo_inactive(context)
+
+    context["repo_events"]["latest"]["ReleaseEvent"] = "2022-05-31T23:00:00Z"
+    assert not stream.is_repo_inactive(context)
+
+    # The events feed overflowed, sync everything.
+    context["repo_events"]["latest"] = None
+    assert not stream.is_repo_inactive(context)
+
+    # The GraphQL stargazers stream is planned from WatchEvent, like stargazers_rest.
+    state["bookmarks"]["stargazers"] = {
+        "partitions": [
+            {
+                "context": {"repo_id": 1},
+                "events_planner_bookmark": "2022-06-01T00:00:00Z",
+            }
+        ]
+    }
+    stargazers = StargazersGraphqlStream(
+        TapGitHub(config=repo_list_config, state=state)
+    )
+    context["repo_events"]["latest"] = {"ReleaseEvent": "2022-06-01T12:00:00Z"}
+    assert stargazers.is_repo_inactive(context)
+
+    context["repo_events"]["latest"]["WatchEvent"] = "2022-06-01T12:00:00Z"
+    assert not stargazers.is_repo_inactive(context)
+
+
+def test_unchanged_records_are_suppressed(repo_list_config, tmp_path):
+    repo_list_config["local_cache_path"] = str(tmp_path / "cache.sqlite")
+    repo_list_config["suppress_unchanged_records"] = True
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["assignees"]
+    records = [{"id": 1, "login": "octocat"}, {"id": 2, "login": "hubot"}]
+    stream.request_records = lambda context: iter([dict(r) for r in records])
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+
+    def emitted_ids():
+        return [
+            record["id"]
+            for record in stream.get_records(context)
+            if not stream.is_record_unchanged(record)
+        ]
+
+    assert emitted_ids() == [1, 2]
+    assert emitted_ids() == []
+    records[1]["login"] = "monalisa"
+    assert emitted_ids() == [2]
+
+    # Records which disappear are emitted again when they come back.
+    removed_record = records.pop(0)
+    assert emitted_ids() == []
+    records.append(removed_record)
+    assert emitted_ids() == [1]
+
+
+def test_local_store_caps_each_namespace(tmp_path):
+    store = LocalStore(str(tmp_path / "cache.sqlite"), max_rows=2)
+    for i in range(5):
+        store.set("commits", "repo", f"sha{i}", "")
+    store.set("repo_ids", "", "org/repo", "1")
+    store.evict()
+
+    assert store.get("repo_ids", "", "org/repo") == "1"
+    remaining = [i for i in range(5) if store.get("commits", "repo", f"sha{i}") == ""]
+    assert len(remaining) == 2
+
+
+def test_min_refresh_interval_skips_recent_partitions(repo_list_config):
+    repo_list_config["min_refresh_intervals"] = {"languages": 3600}
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["languages"]
+    stream.request_records = lambda context: iter([{"ruby": 100}])
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+
+    assert len(list(stream.get_records(context))) == 1
+    assert "last_synced_at" in stream.get_context_state(context)
+    assert list(stream.get_records(context)) == []
+
+    stream.get_context_state(context)["last_synced_at"] = "2022-06-01T00:00:00Z"
+    assert len(list(stream.get_records(context))) == 1
+
+
+def test_indexed_context_state(repo_list_config):
+    state = {
+        "bookmarks": {
+            "workflow_run_jobs": {
+                "partitions": [
+                    {
+                        "context": {
+                            "org": "MeltanoLabs",
+                            "repo": "tap-github",
+                            "run_id": i,
+                        },
+                        "replication_key_value": i,
+                    }
+                    for i in range(1000)
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=repo_list_config, state=state)
+    stream = tap.streams["workflow_run_jobs"]
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1, "run_id": 42}
+    assert stream.get_context_state(context)["replication_key_value"] == 42
+
+    # New partitions are created once, and partitions added outside are found.
+    context["run_id"] = 1000
+    assert stream.get_context_state(context) is stream.get_context_state(context)
+    stream.stream_state["partitions"].append(
+        {"context": {"org": "MeltanoLabs", "repo": "tap-github", "run_id": 1001}}
+    )
+    context["run_id"] = 1001
+    stream.get_context_state(context)["replication_key_value"] = 1001
+    assert len(stream.stream_state["partitions"]) == 1002
+    assert stream.stream_state["partitions"][-1]["replication_key_value"] == 1001
@@ -0,0 +1,98 @@
+"""Tests for organization streams logic which does not need API access."""
+import json
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+from tap_github.client import GitHubRestStream
+from tap_github.tap import TapGitHub
+
+from .fixtures import fake_response, organization_list_config
+
+
+def test_team_memberships_are_fetched_in_bulk(organization_list_config):
+    organization_list_config["graphql_team_memberships"] = True
+    tap = TapGitHub(config=organization_list_config)
+    org = organization_list_config["organizations"][0]
+    rest_paths = []
+    team_queries = []
+    graphql_streams = set()
+
+    def member(login: str, role: str = "MEMBER") -> dict:
+        return {"role": role, "node": {"login": login, "id": len(login)}}
+
+    def _request(self, prepared_request, context):
+        path = urlparse(prepared_request.url).path
+        if path != "/graphql":
+            rest_paths.append(path)
+            return fake_response(prepared_request, [])
+        graphql_streams.add(id(self))
+        body = json.loads(prepared_request.body)
+        if "teamMembers" in body["query"]:
+            team_queries.append(body["variables"]["nextPageCursor_0"])
+            data = {
+                "organization": {
+                    "team": {
+                        "members": {
+                            "pageInfo": {"hasNextPage_0": False},
+                            "edges": [member("carol")],
+                        }
+                    }
+                }
+            }
+        else:
+            data = {
+                "organization": {
+                    "teams": {
+                        "pageInfo": {"hasNextPage_0": False},
+                        "nodes": [
+                            {
+                                "id": 10,
+                                "slug": "core",
+                                "organization": {"id": 1},
+                                "members": {
+                                    "pageInfo": {"hasNextPage": False},
+                                    "edges": [member("alice", "MAINTAINER")],
+                                },
+                            },
+                            {
+                                "id": 11,
+                                "slug": "large",
+                                "organization": {"id": 1},
+                                "members": {
+                                    "pageInfo": {
+                                        "hasNextPage": True,
+                                        "endCursor": "cursor",
+                                    },
+                                    "edges": [member("bob")],
+                                },
+                            },
+                        ],
+                    }
+                }
+            }
+        return fake_response(prepared_request, {"data": data})
+
+    members: dict = {}
+    roles = []
+    with patch.object(GitHubRestStream, "_request", _request):
+        team_members = tap.streams["team_members"]
+        for team_slug in ["core", "large", "new"]:
+            context = {"org": org, "team_slug": team_slug}
+            members[team_slug] = []
+            for record in team_members.request_records(context):
+                members[team_slug].append(record["login"])
+                member_context = team_members.get_child_context(record, context)
+                roles += tap.streams["team_roles"].request_records(member_context)
+        # The GraphQL streams are reused by the next organizations.
+        team_members.request_memberships("other-org")
+
+    assert team_queries == ["cursor", "cursor"]
+    assert len(graphql_streams) == 2
+    assert rest_paths == [f"/orgs/{org}/teams/new/members"]
+    assert members == {"core": ["alice"], "large": ["bob", "carol"], "new": []}
+    assert roles[0] == {
+        "url": "https://api.github.com/organizations/1/team/10/memberships/alice",
+        "role": "maintainer",
+        "state": "active",
+    }
+    assert [role["role"] for role in roles] == ["maintainer", "member", "member"]
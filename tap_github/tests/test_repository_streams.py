@@ -0,0 +1,760 @@
+"""Tests for repository streams logic which does not need API access."""
+import json
+import re
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from tap_github.client import GitHubRestStream
+from tap_github.repository_streams import RepositoryStream
+from tap_github.tap import TapGitHub
+
+from .fixtures import (
+    fake_response,
+    organization_list_config,
+    repo_list_config,
+    search_config,
+)
+
+
+def fake_search_total_count(self, context: dict) -> int:
+    """Pretend that 250 repos were created every year since 2008."""
+    query = context.get("search_shard_query", context["search_query"])
+    match = re.search(r"created:(\d{4})-(\d\d)\S*\.\.(\d{4})-(\d\d)", query)
+    if match is None:
+        return 250 * 15
+    start = int(match.group(1)) + (int(match.group(2)) - 1) / 12
+    end = int(match.group(3)) + (int(match.group(4)) - 1) / 12
+    return int(250 * max(0, end - max(start, 2008)))
+
+
+def test_search_shards_fit_under_results_limit(search_config):
+    tap = TapGitHub(config=search_config)
+    stream = tap.streams["repositories"]
+    context = stream.partitions[0]
+    with patch.object(
+        RepositoryStream, "get_search_total_count", fake_search_total_count
+    ):
+        shards = stream.get_search_shards(context)
+
+    assert len(shards) > 1
+    for shard in shards:
+        assert shard.startswith(context["search_query"] + " created:")
+        total_count = fake_search_total_count(
+            stream, {**context, "search_shard_query": shard}
+        )
+        assert 0 < total_count <= RepositoryStream.MAX_RESULTS_LIMIT
+
+
+def test_small_search_is_not_sharded(search_config):
+    tap = TapGitHub(config=search_config)
+    stream = tap.streams["repositories"]
+    context = stream.partitions[0]
+    with patch.object(RepositoryStream, "get_search_total_count", return_value=10):
+        assert stream.get_search_shards(context) == [context["search_query"]]
+
+
+def test_stats_contributors_starting_week(repo_list_config):
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    state = {
+        "bookmarks": {
+            "stats_contributors": {
+                "partitions": [
+                    {
+                        "context": {"org": "MeltanoLabs", "repo": "tap-github"},
+                        "replication_key": "week_start",
+                        "replication_key_value": 1654387200,
+                    }
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=repo_list_config, state=state)
+    stream = tap.streams["stats_contributors"]
+    stream._write_starting_replication_value(context)
+    assert stream.get_starting_week(context) == 1654387200
+
+    # Without a bookmark, start from the Sunday before `start_date`.
+    repo_list_config["start_date"] = "2022-06-08T12:00:00Z"
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["stats_contributors"]
+    stream._write_starting_replication_value(context)
+    assert stream.get_starting_week(context) == 1654387200  # 2022-06-05
+
+
+def test_incremental_organization_listing(organization_list_config):
+    organization_list_config["incremental_organization_listing"] = True
+    context = {"org": "MeltanoLabs"}
+    tap = TapGitHub(config=organization_list_config)
+    stream = tap.streams["repositories"]
+    stream._write_starting_replication_value(context)
+    params = stream.get_url_params(context, None)
+    # The first run lists all repos, regardless of start_date.
+    assert params["direction"] == "desc"
+    assert "since" not in params
+
+    state = {
+        "bookmarks": {
+            "repositories": {
+                "partitions": [
+                    {
+                        "context": context,
+                        "replication_key": "updated_at",
+                        "replication_key_value": "2022-06-01T00:00:00Z",
+                    }
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=organization_list_config, state=state)
+    stream = tap.streams["repositories"]
+    stream._write_starting_replication_value(context)
+    params = stream.get_url_params(context, None)
+    assert params["since"] == "2022-06-01T00:00:00Z"
+
+
+def test_commits_stop_at_known_head(repo_list_config):
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    state = {
+        "bookmarks": {
+            "commits": {
+                "partitions": [
+                    {
+                        "context": {"org": "MeltanoLabs", "repo": "tap-github"},
+                        "head_sha": "sha150",
+                    }
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=repo_list_config, state=state)
+    stream = tap.streams["commits"]
+    requested_pages = []
+
+    def _request(prepared_request, context):
+        """Serve 300 commits, most recent first."""
+        page = int(parse_qs(urlparse(prepared_request.url).query).get("page", [1])[0])
+        requested_pages.append(page)
+        commits = [
+            {"sha": f"sha{i}", "commit": {"committer": {"date": "2022-01-01"}}}
+            for i in range((page - 1) * 100, page * 100)
+        ]
+        links = {}
+        if page < 3:
+            links["next"] = f"https://api.github.com/x?page={page + 1}"
+        return fake_response(prepared_request, commits, links)
+
+    stream._request = _request
+    records = list(stream.get_records(context))
+    assert [record["sha"] for record in records] == [f"sha{i}" for i in range(150)]
+    assert requested_pages == [1, 2]
+    assert stream.get_context_state(context)["head_sha"] == "sha0"
+
+    # The head did not change: a single request and no records.
+    requested_pages.clear()
+    assert list(stream.get_records(context)) == []
+    assert requested_pages == [1]
+    assert stream.get_context_state(context)["head_sha"] == "sha0"
+
+
+def test_commits_of_all_branches_are_deduplicated(repo_list_config):
+    repo_list_config["commits_all_branches"] = True
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    history = {
+        "main": ["m3", "m2", "m1", "m0"],
+        "feature": ["f2", "f1", "m2", "m1", "m0"],
+    }
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["commits"]
+
+    def _request(self, prepared_request, context):
+        query = parse_qs(urlparse(prepared_request.url).query)
+        if prepared_request.url.split("?")[0].endswith("/branches"):
+            results = [
+                {"name": name, "commit": {"sha": shas[0]}}
+                for name, shas in history.items()
+            ]
+        else:
+            results = [
+                {"sha": sha, "commit": {"committer": {"date": "2022-01-01"}}}
+                for sha in history[query.get("sha", ["main"])[0]]
+            ]
+        return fake_response(prepared_request, results)
+
+    with patch.object(GitHubRestStream, "_request", _request):
+        records = list(stream.get_records(context))
+        assert [r["sha"] for r in records] == ["m3", "m2", "m1", "m0", "f2", "f1"]
+
+        history["feature"].insert(0, "f3")
+        records = list(stream.get_records(context))
+        assert [r["sha"] for r in records] == ["f3"]
+
+
+def fake_workflow_runs_api(total_runs: int, requests_params: list):
+    """Build a fake `_request` serving runs, one per hour and most recent first,
+    until June 11th. The query parameters of each request are appended to
+    `requests_params`.
+    """
+
+    def _request(prepared_request, context):
+        query = parse_qs(urlparse(prepared_request.url).query)
+        requests_params.append(query)
+        page = int(query.get("page", [1])[0])
+        runs = [
+            {
+                "id": i,
+                "created_at": f"{datetime(2022, 6, 11) - timedelta(hours=i):%Y-%m-%dT%H:%M:%SZ}",
+                "updated_at": "2022-06-11T00:00:00Z",
+            }
+            for i in range((page - 1) * 100, min(page * 100, total_runs))
+        ]
+        total_count = total_runs
+        if "created" in query:
+            floor = datetime.strptime(query["created"][0], ">=%Y-%m-%dT%H:%M:%SZ")
+            hours = (datetime(2022, 6, 11) - floor) / timedelta(hours=1)
+            total_count = min(int(hours) + 1, total_runs)
+        links = {}
+        if page * 100 < total_runs:
+            links["next"] = f"https://api.github.com/x?page={page + 1}"
+        return fake_response(
+            prepared_request,
+            {"total_count": total_count, "workflow_runs": runs},
+            links,
+        )
+
+    return _request
+
+
+def test_workflow_runs_filter_on_created(repo_list_config):
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    state = {
+        "bookmarks": {
+            "workflow_runs": {
+                "partitions": [
+                    {
+                        "context": {"org": "MeltanoLabs", "repo": "tap-github"},
+                        "replication_key": "updated_at",
+                        "replication_key_value": "2022-06-10T00:00:00Z",
+                    }
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=repo_list_config, state=state)
+    stream = tap.streams["workflow_runs"]
+    stream._write_starting_replication_value(context)
+    requests_params: list = []
+    stream._request = fake_workflow_runs_api(3000, requests_params)
+    list(stream.request_records(context))
+    assert requests_params[0]["created"] == [">=2022-06-09T00:00:00Z"]
+    assert "sort" not in requests_params[0] and "since" not in requests_params[0]
+    assert len(requests_params) == 1
+
+    # Too many runs to filter: walk them until they were created before the floor.
+    requests_params.clear()
+    stream.created_lookback = timedelta(days=60)
+    list(stream.request_records(context))
+    assert "created" in requests_params[0]
+    assert [params.get("page", ["1"]) for params in requests_params[1:]] == [
+        [str(page)] for page in range(1, 16)
+    ]
+
+
+def test_workflow_runs_first_sync_is_not_filtered(repo_list_config):
+    repo_list_config.pop("start_date")
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["workflow_runs"]
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    stream._write_starting_replication_value(context)
+    requests_params: list = []
+    stream._request = fake_workflow_runs_api(1500, requests_params)
+
+    records = list(stream.request_records(context))
+    assert len(records) == 1500
+    assert [params.get("page", ["1"]) for params in requests_params] == [
+        [str(page)] for page in range(1, 16)
+    ]
+    assert not any("created" in params for params in requests_params)
+
+
+def test_jobs_of_completed_runs_are_fetched_once(repo_list_config, tmp_path):
+    repo_list_config["local_cache_path"] = str(tmp_path / "cache.sqlite")
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["workflow_run_jobs"]
+    requested_runs = []
+
+    def request_records(context):
+        requested_runs.append((context["run_id"], context["run_attempt"]))
+        return iter([{"id": context["run_id"] * 10}])
+
+    stream.request_records = request_records
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    runs = [
+        {**context, "run_id": 1, "run_status": "in_progress", "run_attempt": 1},
+        {**context, "run_id": 2, "run_status": "completed", "run_attempt": 1},
+    ]
+    for run_context in runs:
+        list(stream.get_records(run_context))
+    assert requested_runs == [(1, 1), (2, 1)]
+
+    runs[0]["run_status"] = "completed"
+    for run_context in runs:
+        list(stream.get_records(run_context))
+    assert requested_runs[2:] == [(1, 1)]
+
+    # A re-attempted run is requested again, and once more after it completes.
+    runs[1].update(run_status="queued", run_attempt=2)
+    for run_context in runs:
+        list(stream.get_records(run_context))
+    runs[1]["run_status"] = "completed"
+    for _ in range(2):
+        for run_context in runs:
+            list(stream.get_records(run_context))
+    assert requested_runs[3:] == [(2, 2), (2, 2)]
+
+
+def fake_dated_api(dates: list, requested_pages: list):
+    """Build a fake `_request` serving one record per date, up to 10 per page."""
+
+    def _request(prepared_request, context):
+        params = parse_qs(urlparse(prepared_request.url).query)
+        page = int(params.get("page", [1])[0])
+        per_page = min(int(params["per_page"][0]), 10)
+        requested_pages.append(page if per_page > 1 else "count")
+        last_page = (len(dates) + per_page - 1) // per_page
+        records = [
+            {"id": i, "published_at": date, "updated_at": date}
+            for i, date in enumerate(dates)
+        ][(page - 1) * per_page : page * per_page]
+        links = {"last": f"https://api.github.com/x?page={last_page}"}
+        if page < last_page:
+            links["next"] = f"https://api.github.com/x?page={page + 1}"
+        return fake_response(prepared_request, records, links)
+
+    return _request
+
+
+def get_bookmarked_stream(
+    config: dict, stream_name: str, replication_key: str, context: dict
+):
+    state = {
+        "bookmarks": {
+            stream_name: {
+                "partitions": [
+                    {
+                        "context": {"org": context["org"], "repo": context["repo"]},
+                        "replication_key": replication_key,
+                        "replication_key_value": "2022-06-01T00:00:00Z",
+                    }
+                ]
+            }
+        }
+    }
+    tap = TapGitHub(config=config, state=state)
+    stream = tap.streams[stream_name]
+    stream._write_starting_replication_value(context)
+    return stream
+
+
+def test_releases_exit_early(repo_list_config):
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    stream = get_bookmarked_stream(
+        repo_list_config, "releases", "published_at", context
+    )
+    # Two drafts, then one release per day, newest first.
+    dates = [None, None] + [
+        f"{datetime(2022, 6, 15) - timedelta(days=i):%Y-%m-%dT%H:%M:%SZ}"
+        for i in range(100)
+    ]
+    requested_pages: list = []
+    stream._request = fake_dated_api(dates, requested_pages)
+    list(stream.request_records(context))
+    assert requested_pages == [1, 2]
+
+
+def test_commit_comments_paginate_backwards(repo_list_config):
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    stream = get_bookmarked_stream(
+        repo_list_config, "commit_comments", "updated_at", context
+    )
+    # One comment per day, oldest first.
+    dates = [
+        f"{datetime(2022, 3, 8) + timedelta(days=i):%Y-%m-%dT%H:%M:%SZ}"
+        for i in range(100)
+    ]
+    stream.MAX_PER_PAGE = 10
+    requested_pages: list = []
+    stream._request = fake_dated_api(dates, requested_pages)
+    records = list(stream.request_records(context))
+    # The oldest comments of the first page are neither requested nor emitted.
+    assert requested_pages == ["count", 10, 9, 8]
+    assert sorted(record["id"] for record in records) == list(range(85, 100))
+
+    # The first page is requested when it holds comments since the bookmark.
+    requested_pages.clear()
+    stream._request = fake_dated_api(dates[80:95], requested_pages)
+    records = list(stream.request_records(context))
+    assert requested_pages == ["count", 2, 1]
+    assert sorted(record["id"] for record in records) == list(range(5, 15))
+
+
+def graphql_repository(org: str, name: str, repo_id: int) -> dict:
+    """Return a repository as returned by the GraphQL repositoryFields fragment."""
+    return {
+        "node_id": f"R_{repo_id}",
+        "id": repo_id,
+        "name": name,
+        "full_name": f"{org}/{name}",
+        "html_url": f"https://github.com/{org}/{name}",
+        "owner": {"login": org, "id": 7, "type": "Organization"},
+        "licenseInfo": {"key": "mit", "name": "MIT License", "spdx_id": "MIT"},
+        "defaultBranchRef": {"name": "main"},
+        "updated_at": f"2022-06-{repo_id:02d}T00:00:00Z",
+        "repositoryTopics": {"nodes": [{"topic": {"name": "singer"}}]},
+        "visibility": "PUBLIC",
+        "primaryLanguage": None,
+        "stargazers_count": 10,
+        "forks_count": 2,
+        "openIssues": {"totalCount": 3},
+        "openPullRequests": {"totalCount": 1},
+        "watchers": {"totalCount": 4},
+    }
+
+
+def test_graphql_repositories_are_batched(repo_list_config):
+    repo_list_config["graphql_repositories"] = True
+    repo_list_config["repositories"] = ["org/repo1", "org/repo2", "org/repo3"]
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["repositories"]
+    stream.GRAPHQL_BATCH_SIZE = 2
+    stream.get_repo_ids = lambda repo_list: [
+        {"org": org, "repo": name, "repo_id": i + 1}
+        for i, (org, name) in enumerate(repo_list)
+    ]
+    queries = []
+
+    def _request(self, prepared_request, context):
+        query = json.loads(prepared_request.body)["query"]
+        queries.append(query)
+        aliases = re.findall(r'(repo\d+): repository\(name: "repo(\d)"', query)
+        data = {
+            alias: graphql_repository("org", f"repo{i}", int(i))
+            for alias, i in aliases
+            if i != "2"  # repo2 was deleted since its id was resolved.
+        }
+        return fake_response(prepared_request, {"data": data})
+
+    with patch.object(GitHubRestStream, "_request", _request):
+        records = [
+            record
+            for context in stream.partitions
+            for record in stream.request_records(context)
+        ]
+
+    assert len(queries) == 2
+    assert [record["full_name"] for record in records] == ["org/repo1", "org/repo3"]
+    record = records[0]
+    assert record["license"]["url"] == "https://api.github.com/licenses/mit"
+    assert record["default_branch"] == "main"
+    assert record["topics"] == ["singer"]
+    assert record["visibility"] == "public"
+    assert record["open_issues_count"] == 4
+    assert record["watchers_count"] == 10 and record["subscribers_count"] == 4
+    assert record["organization"]["login"] == "org"
+    assert record["clone_url"] == "https://github.com/org/repo1.git"
+
+
+def test_graphql_repository_fields_follow_their_properties(repo_list_config):
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["repositories"]
+    for property_name in ["license", "topics", "subscribers_count"]:
+        stream.metadata[("properties", property_name)].selected = False
+    fragment = stream.graphql_repository_fragment
+    assert "licenseInfo" not in fragment
+    assert "repositoryTopics" not in fragment
+    assert "watchers" not in fragment
+    assert "primaryLanguage { name }" in fragment
+    # open_issues_count is compared by `change_gated_streams`.
+    assert "openIssues : issues" in fragment
+
+    repo = graphql_repository("org", "repo1", 1)
+    for field_name in ["licenseInfo", "repositoryTopics", "watchers"]:
+        del repo[field_name]
+    record = stream.get_record_from_graphql(repo)
+    assert record["default_branch"] == "main"
+    assert record["open_issues_count"] == 4
+    assert "licenseInfo" not in record and "repositoryTopics" not in record
+
+
+def test_repo_ids_are_chunked_and_cached(repo_list_config, tmp_path):
+    repo_list_config["local_cache_path"] = str(tmp_path / "cache.sqlite")
+    tap = TapGitHub(config=repo_list_config)
+    stream = tap.streams["repositories"]
+    repo_list = [("Org", f"Repo{i}") for i in range(250)]
+    requested_chunks = []
+    authenticators = set()
+
+    def _request(self, prepared_request, context):
+        query = json.loads(prepared_request.body)["query"]
+        names = re.findall(r'repository\(name: "Repo(\d+)"', query)
+        requested_chunks.append(len(names))
+        authenticators.add(id(self.authenticator))
+        data = {
+            f"repo{i}": (
+                {"nameWithOwner": f"org/repo{name}", "databaseId": int(name)}
+                if name != "42"
+                else None
+            )
+            for i, name in enumerate(names)
+        }
+        return fake_response(prepared_request, {"data": data})
+
+    with patch.object(GitHubRestStream, "_request", _request):
+        repos = stream.get_repo_ids(repo_list)
+        assert sorted(requested_chunks) == [50, 100, 100]
+        assert [repo["repo_id"] for repo in repos] == [i for i in range(250) if i != 42]
+        assert repos[0] == {"org": "org", "repo": "repo0", "repo_id": 0}
+
+        # Only the missing repo is requested again.
+        requested_chunks.clear()
+        assert stream.get_repo_ids(repo_list) == repos
+        assert requested_chunks == [1]
+
+        # All chunks share the authenticator of the stream.
+        assert len(authenticators) == 1
+
+
+def test_child_streams_are_bundled(repo_list_config):
+    repo_list_config["graphql_repo_bundles"] = True
+    repo_list_config["repositories"] = ["org/repo1", "org/repo2", "org/repo3"]
+    tap = TapGitHub(config=repo_list_config)
+    repositories = tap.streams["repositories"]
+    repositories.REPO_BUNDLE_SIZE = 2
+    repositories.get_repo_ids = lambda repo_list: [
+        {"org": org, "repo": name, "repo_id": i + 1}
+        for i, (org, name) in enumerate(repo_list)
+    ]
+    graphql_queries = []
+    rest_paths = []
+
+    def _request(self, prepared_request, context):
+        path = urlparse(prepared_request.url).path
+        if path != "/graphql":
+            rest_paths.append(path)
+            return fake_response(prepared_request, {"Python": 300})
+
+        query = json.loads(prepared_request.body)["query"]
+        graphql_queries.append(query)
+        data = {}
+        for alias, i in re.findall(r'(repo\d+): repository\(name: "repo(\d)"', query):
+            data[alias] = {
+                "languages": {
+                    "pageInfo": {"hasNextPage": i == "3"},
+                    "edges": [{"bytes": 100, "node": {"language_name": "Python"}}],
+                },
+                # Without push access, the connection is null.
+                "collaborators": None
+                if i == "2"
+                else {
+                    "pageInfo": {"hasNextPage": False},
+                    "edges": [
+                        {
+                            "permission": "WRITE",
+                            "node": {"login": "octocat", "id": 1, "type": "User"},
+                        }
+                    ],
+                },
+            }
+        return fake_response(prepared_request, {"data": data})
+
+    records: dict = {"languages": [], "collaborators": []}
+    with patch.object(GitHubRestStream, "_request", _request):
+        for context in repositories.partitions:
+            for stream_name in records:
+                stream = tap.streams[stream_name]
+                records[stream_name] += list(stream.request_records(context))
+
+    assert len(graphql_queries) == 2
+    assert "languages:" in graphql_queries[0] and "collaborators:" in graphql_queries[0]
+    assert rest_paths == [
+        "/repos/org/repo2/collaborators",
+        "/repos/org/repo3/languages",
+    ]
+    assert records["languages"][0] == {"language_name": "Python", "bytes": 100}
+    collaborator = records["collaborators"][0]
+    assert collaborator["role_name"] == "write"
+    assert collaborator["permissions"] == {
+        "pull": True,
+        "triage": True,
+        "push": True,
+        "maintain": False,
+        "admin": False,
+    }
+    assert collaborator["url"] == "https://api.github.com/users/octocat"
+
+
+def test_pull_request_children_are_bundled(repo_list_config):
+    repo_list_config["graphql_pull_request_bundles"] = True
+    tap = TapGitHub(config=repo_list_config)
+    pull_requests = tap.streams["pull_requests"]
+    pull_requests.PULL_REQUEST_BUNDLE_SIZE = 2
+    pull_requests.request_records = lambda context: iter(
+        [{"number": number, "body": None} for number in [1, 2, 3]]
+    )
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    graphql_queries = []
+    rest_paths = []
+
+    def _request(self, prepared_request, context):
+        path = urlparse(prepared_request.url).path
+        if path != "/graphql":
+            rest_paths.append(path)
+            return fake_response(prepared_request, [])
+
+        query = json.loads(prepared_request.body)["query"]
+        graphql_queries.append(query)
+        data = {
+            alias: {
+                "reviews": {
+                    "pageInfo": {"hasNextPage": number == "2"},
+                    "nodes": [
+                        {
+                            "id": 10,
+                            "user": {"login": "octocat", "id": 1, "type": "User"},
+                            "state": "APPROVED",
+                            "html_url": "https://github.com/pr#review",
+                            "commit": {"oid": "abc"},
+                        }
+                    ],
+                },
+                "pull_request_commits": {
+                    "pageInfo": {"hasNextPage": False},
+                    "nodes": [
+                        {
+                            "commit": {
+                                "sha": "abc",
+                                "node_id": "C_abc",
+                                "html_url": "https://github.com/commit/abc",
+                                "message": "Fix",
+                                "author": {
+                                    "name": "Octo",
+                                    "email": "octo@cat.com",
+                                    "date": "2022-01-01T00:00:00Z",
+                                    "user": None,
+                                },
+                                "committer": None,
+                                "tree": {"oid": "def"},
+                                "comments": {"totalCount": 0},
+                                "signature": None,
+                                "parents": {"nodes": [{"oid": "123"}]},
+                            }
+                        }
+                    ],
+                },
+            }
+            for alias, number in re.findall(
+                r"(pr\d+): pullRequest\(number: (\d+)\)", query
+            )
+        }
+        return fake_response(prepared_request, {"data": {"repository": data}})
+
+    records: dict = {"reviews": [], "pull_request_commits": []}
+    with patch.object(GitHubRestStream, "_request", _request):
+        for pull_request in pull_requests.get_records(context):
+            child_context = pull_requests.get_child_context(pull_request, context)
+            for stream_name in records:
+                stream = tap.streams[stream_name]
+                records[stream_name] += list(stream.request_records(child_context))
+
+    assert len(graphql_queries) == 2
+    assert rest_paths == ["/repos/MeltanoLabs/tap-github/pulls/2/reviews"]
+    review = records["reviews"][0]
+    assert review["commit_id"] == "abc"
+    assert review["user"]["url"] == "https://api.github.com/users/octocat"
+    assert review["_links"]["pull_request"]["href"] == (
+        "https://api.github.com/repos/MeltanoLabs/tap-github/pulls/1"
+    )
+    commit = records["pull_request_commits"][0]
+    assert commit["commit"]["author"]["email"] == "octo@cat.com"
+    assert commit["commit"]["verification"]["reason"] == "unsigned"
+    assert commit["parents"][0]["sha"] == "123"
+    assert commit["author"] is None
+    assert len(records["pull_request_commits"]) == 3
+
+
+def test_projects_are_fetched_with_columns_and_cards(repo_list_config):
+    repo_list_config["graphql_projects"] = True
+    tap = TapGitHub(config=repo_list_config)
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    rest_paths = []
+
+    def card(card_id: int) -> dict:
+        return {
+            "id": card_id,
+            "creator": None,
+            "content": {"number": 7, "repository": {"nameWithOwner": "org/repo"}},
+        }
+
+    project = {
+        "id": 100,
+        "state": "OPEN",
+        "creator": {"login": "octocat", "id": 1, "type": "User"},
+        "columns": {
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [
+                {
+                    "id": 10,
+                    "cards": {"pageInfo": {"hasNextPage": False}, "nodes": [card(1)]},
+                },
+                {
+                    "id": 11,
+                    "cards": {"pageInfo": {"hasNextPage": True}, "nodes": [card(2)]},
+                },
+            ],
+        },
+    }
+
+    def _request(self, prepared_request, context):
+        path = urlparse(prepared_request.url).path
+        if path != "/graphql":
+            rest_paths.append(path)
+            return fake_response(prepared_request, [])
+        data = {
+            "repository": {
+                "projects": {
+                    "pageInfo": {"hasNextPage_0": False},
+                    "nodes": [project],
+                }
+            }
+        }
+        return fake_response(prepared_request, {"data": data})
+
+    records: dict = {"projects": [], "project_columns": [], "project_cards": []}
+    with patch.object(GitHubRestStream, "_request", _request):
+        projects = tap.streams["projects"]
+        for project_record in projects.request_records(context):
+            records["projects"].append(project_record)
+            project_context = projects.get_child_context(project_record, context)
+            columns = tap.streams["project_columns"]
+            for column in columns.request_records(project_context):
+                records["project_columns"].append(column)
+                column_context = columns.get_child_context(column, project_context)
+                cards = tap.streams["project_cards"].request_records(column_context)
+                records["project_cards"] += list(cards)
+
+    assert rest_paths == ["/projects/columns/11/cards"]
+    assert records["projects"][0]["columns_url"] == (
+        "https://api.github.com/projects/100/columns"
+    )
+    assert records["projects"][0]["state"] == "open"
+    assert [column["id"] for column in records["project_columns"]] == [10, 11]
+    assert records["project_cards"] == [
+        {
+            "id": 1,
+            "creator": None,
+            "url": "https://api.github.com/projects/columns/cards/1",
+            "column_url": "https://api.github.com/projects/columns/10",
+            "content_url": "https://api.github.com/repos/org/repo/issues/7",
+            "project_url": "https://api.github.com/projects/100",
+        }
+    ]
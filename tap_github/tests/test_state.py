@@ -0,0 +1,166 @@
+"""Tests for the compact state encoding and STATE messages."""
+import copy
+from unittest.mock import patch
+
+from tap_github.tap import TapGitHub
+from tap_github.utils.state import StateWriter, compact_state, expand_state, merge_state
+
+from .fixtures import repo_list_config
+
+verbose_state = {
+    "bookmarks": {
+        "repositories": {
+            "partitions": [
+                {
+                    "context": {
+                        "org": "MeltanoLabs",
+                        "repo": "tap-github",
+                        "repo_id": 1,
+                    },
+                    "replication_key": "updated_at",
+                    "replication_key_value": "2022-06-01T00:00:00Z",
+                },
+            ]
+        },
+        "issues": {
+            "partitions": [
+                {
+                    "context": {"org": "MeltanoLabs", "repo": "tap-github"},
+                    "replication_key": "updated_at",
+                    "replication_key_value": "2022-06-02T00:00:00Z",
+                },
+                # Unknown repository, kept verbose.
+                {
+                    "context": {"org": "MeltanoLabs", "repo": "tap-gitlab"},
+                    "replication_key": "updated_at",
+                    "replication_key_value": "2022-06-03T00:00:00Z",
+                },
+            ]
+        },
+        "project_cards": {
+            "partitions": [
+                {
+                    "context": {
+                        "project_id": 42,
+                        "org": "MeltanoLabs",
+                        "repo": "tap-github",
+                    },
+                    "replication_key_value": None,
+                },
+                {
+                    "context": {
+                        "project_id": 43,
+                        "org": "MeltanoLabs",
+                        "repo": "tap-github",
+                    },
+                    "last_synced_at": "2022-06-04T00:00:00Z",
+                },
+            ]
+        },
+    }
+}
+
+
+def test_compact_state_round_trip():
+    state = compact_state(verbose_state)
+    bookmarks = state["bookmarks"]
+    assert bookmarks["repositories"]["repo_names"] == {
+        "1": ["MeltanoLabs", "tap-github"]
+    }
+    assert bookmarks["issues"]["compact_partitions"]["partitions"] == {
+        "1": {"replication_key_value": "2022-06-02T00:00:00Z"}
+    }
+    assert len(bookmarks["issues"]["partitions"]) == 1
+    # The empty bookmark of project 42 is omitted.
+    assert bookmarks["project_cards"]["compact_partitions"]["partitions"] == {
+        "[1,43]": {"last_synced_at": "2022-06-04T00:00:00Z"}
+    }
+
+    expanded = expand_state(state)
+    for stream_name in ["repositories", "issues"]:
+        assert sorted(
+            expanded["bookmarks"][stream_name]["partitions"], key=str
+        ) == sorted(verbose_state["bookmarks"][stream_name]["partitions"], key=str)
+    assert expanded["bookmarks"]["project_cards"]["partitions"] == [
+        verbose_state["bookmarks"]["project_cards"]["partitions"][1]
+    ]
+
+
+def test_tap_loads_compact_state(repo_list_config):
+    tap = TapGitHub(config=repo_list_config, state=compact_state(verbose_state))
+    stream = tap.streams["issues"]
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    stream._write_starting_replication_value(context)
+    assert str(stream.get_starting_timestamp(context).date()) == "2022-06-02"
+
+
+def test_delta_state_messages_merge_into_full_state(repo_list_config):
+    repo_list_config["delta_state_messages"] = True
+    state = copy.deepcopy(verbose_state)
+    state["bookmarks"]["issues"]["progress_markers"] = {"Note": "in progress"}
+    tap = TapGitHub(config=repo_list_config, state=state)
+    stream = tap.streams["issues"]
+    context = {"org": "MeltanoLabs", "repo": "tap-github", "repo_id": 1}
+    messages = []
+
+    def write_message(message):
+        messages.append(copy.deepcopy(message.value))
+
+    with patch("singer.write_message", write_message):
+        tap.state_writer.write(stream.tap_state)
+        partition_state = stream.get_context_state(context)
+        partition_state["replication_key_value"] = "2022-06-05T00:00:00Z"
+        stream.get_context_state(None).pop("progress_markers")
+        tap.state_writer.write(stream.tap_state)
+        tap.state_writer.write(stream.tap_state, force=True)
+
+    full, delta, final = messages
+    assert "delta" not in full and "delta" not in final
+    assert delta == {
+        "delta": True,
+        "bookmarks": {
+            "issues": {
+                "deleted_keys": ["progress_markers"],
+                "partitions": [
+                    {
+                        "context": {"org": "MeltanoLabs", "repo": "tap-github"},
+                        "replication_key": "updated_at",
+                        "replication_key_value": "2022-06-05T00:00:00Z",
+                    }
+                ],
+            }
+        },
+    }
+    assert merge_state(full, delta) == final
+
+    # A lone delta is loaded with its bookmarks only.
+    tap = TapGitHub(config=repo_list_config, state=delta)
+    stream = tap.streams["issues"]
+    stream._write_starting_replication_value(context)
+    assert str(stream.get_starting_timestamp(context).date()) == "2022-06-05"
+
+
+def test_delta_state_messages_checkpoint_full_states():
+    writer = StateWriter({"delta_state_messages": True})
+    writer.FULL_STATE_INTERVAL = 3
+    messages = []
+    with patch("singer.write_message", messages.append):
+        for _ in range(5):
+            writer.write(verbose_state)
+    assert ["delta" in message.value for message in messages] == [
+        False,
+        True,
+        True,
+        False,
+        True,
+    ]
+
+
+def test_state_messages_cadence():
+    writer = StateWriter({"state_message_records": 3})
+    messages = []
+    with patch("singer.write_message", messages.append):
+        for _ in range(7):
+            writer.record_written()
+            writer.write(verbose_state)
+    assert len(messages) == 2
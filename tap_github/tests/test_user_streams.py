@@ -0,0 +1,84 @@
+"""Tests for user streams logic which does not need API access."""
+import json
+import re
+import threading
+from unittest.mock import patch
+
+from tap_github.client import GitHubRestStream
+from tap_github.tap import TapGitHub
+
+from .fixtures import fake_response, username_list_config
+
+
+def test_user_ids_are_chunked_and_cached(username_list_config, tmp_path):
+    username_list_config["local_cache_path"] = str(tmp_path / "cache.sqlite")
+    tap = TapGitHub(config=username_list_config)
+    stream = tap.streams["users"]
+    user_list = [f"User{i}" for i in range(150)]
+    requested_chunks = []
+    authenticators = set()
+
+    def _request(self, prepared_request, context):
+        query = json.loads(prepared_request.body)["query"]
+        names = re.findall(r'repositoryOwner\(login: "User(\d+)"', query)
+        requested_chunks.append(len(names))
+        authenticators.add(id(self.authenticator))
+        data = {
+            f"user{i}": (
+                {"login": f"user{name}", "databaseId": int(name)}
+                if name != "7"
+                else None
+            )
+            for i, name in enumerate(names)
+        }
+        return fake_response(prepared_request, {"data": data})
+
+    with patch.object(GitHubRestStream, "_request", _request):
+        users = stream.get_user_ids(user_list)
+        assert sorted(requested_chunks) == [50, 100]
+        assert [user["user_id"] for user in users] == [
+            str(i) for i in range(150) if i != 7
+        ]
+
+        # Both existing and missing users are cached.
+        requested_chunks.clear()
+        assert stream.get_user_ids(user_list) == users
+        assert requested_chunks == []
+
+        stream.MISSING_USERS_CACHE_TTL = 0
+        assert stream.get_user_ids(user_list) == users
+        assert requested_chunks == [1]
+
+        # All chunks share the authenticator of the stream.
+        assert len(authenticators) == 1
+
+
+def test_user_id_chunks_are_requested_concurrently(username_list_config):
+    tap = TapGitHub(config=username_list_config)
+    stream = tap.streams["users"]
+    stream.USER_IDS_BATCH_SIZE = 2
+    user_list = [f"User{i}" for i in range(6)]
+    # The first requests only return once two of them are in flight.
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def _request(self, prepared_request, context):
+        calls.append((self, self.requests_session, self.authenticator))
+        if len(calls) <= 2:
+            barrier.wait()
+        query = json.loads(prepared_request.body)["query"]
+        names = re.findall(r'repositoryOwner\(login: "User(\d+)"', query)
+        data = {
+            f"user{i}": {"login": f"user{name}", "databaseId": int(name)}
+            for i, name in enumerate(names)
+        }
+        return fake_response(prepared_request, {"data": data})
+
+    with patch.object(GitHubRestStream, "_request", _request):
+        users = stream.get_user_ids(user_list)
+
+    assert [user["user_id"] for user in users] == [str(i) for i in range(6)]
+    streams, sessions, authenticators = zip(*calls[:2])
+    # Concurrent requests go through streams and sessions of their own.
+    assert streams[0] is not streams[1] and sessions[0] is not sessions[1]
+    assert authenticators[0] is authenticators[1] is stream.authenticator
@@ -1,13 +1,15 @@
 """User Stream types classes for tap-github."""
 
+import json
 import re
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, cast
 
 from singer_sdk import typing as th  # JSON Schema typing helpers
 from singer_sdk.exceptions import FatalAPIError
 
 from tap_github.client import GitHubGraphqlStream, GitHubRestStream
 from tap_github.schema_objects import user_object
+from tap_github.utils.local_store import LocalStore
 
 
 class UserStream(GitHubRestStream):
@@ -15,6 +17,13 @@ class UserStream(GitHubRestStream):
 
     name = "users"
     replication_key = "updated_at"
+    # User ids are resolved through GraphQL by chunks of this size.
+    USER_IDS_BATCH_SIZE = 100
+    USER_IDS_MAX_WORKERS = 4
+    # Ids never change, but users may be renamed, deleted or created.
+    USER_IDS_CACHE_TTL = 7 * 24 * 3600
+    MISSING_USERS_CACHE_TTL = 24 * 3600
+    _user_partitions: List[Dict[str, str]] = []
 
     @property
     def path(self) -> str:  # type: ignore
@@ -28,8 +37,10 @@ class UserStream(GitHubRestStream):
     def partitions(self) -> Optional[List[Dict]]:
         """Return a list of partitions."""
         if "user_usernames" in self.config:
-            # return [{"username": u} for u in self.config["user_usernames"]]
-            return self.get_user_ids(self.config["user_usernames"])
+            # The SDK reads the partitions before, during and after the sync.
+            if not self._user_partitions:
+                self._user_partitions = self.get_user_ids(self.config["user_usernames"])
+            return self._user_partitions
         elif "user_ids" in self.config:
             return [{"id": id} for id in self.config["user_ids"]]
         return None
@@ -47,72 +58,91 @@ class UserStream(GitHubRestStream):
         It uses the github graphql api to fetch the databaseId.
         It also removes non-existant repos and corrects casing to ensure
         data is correct downstream.
-        """
-        # use a temp handmade stream to reuse all the graphql setup of the tap
-        class TempStream(GitHubGraphqlStream):
-            name = "tempStream"
-            schema = th.PropertiesList(
-                th.Property("id", th.StringType),
-                th.Property("databaseId", th.IntegerType),
-            ).to_dict()
-
-            def __init__(self, tap, user_list) -> None:
-                super().__init__(tap)
-                self.user_list = user_list
 
-            @property
-            def query(self) -> str:
-                chunks = list()
-                # there is probably some limit to how many items can be requested
-                # in a single query, but it's well above 1k.
-                for i, user in enumerate(self.user_list):
-                    # we use the `repositoryOwner` query which is the only one that
-                    # works on both users and orgs with graphql. REST is less picky
-                    # and the /user endpoint works for all types.
-                    chunks.append(
-                        f'user{i}: repositoryOwner(login: "{user}") '
-                        "{ login avatarUrl}"
-                    )
-                return "query {" + " ".join(chunks) + " }"
-
-        users_with_ids: list = list()
-        temp_stream = TempStream(self._tap, list(user_list))
+        Users are resolved by chunks of USER_IDS_BATCH_SIZE, sent concurrently.
+        With `local_cache_path`, resolved users are kept for USER_IDS_CACHE_TTL,
+        and users which do not exist for MISSING_USERS_CACHE_TTL.
+        """
+        local_store = self.local_store
+        users_by_index: Dict[int, Dict[str, str]] = {}
+        unresolved = []
+        for i, username in enumerate(user_list):
+            cached_user = (
+                local_store.get(
+                    "user_ids", "", username.lower(), self.USER_IDS_CACHE_TTL
+                )
+                if local_store is not None
+                else None
+            )
+            if cached_user is None:
+                unresolved.append(i)
+            elif cached_user != "null":
+                users_by_index[i] = json.loads(cached_user)
+            elif (
+                cast(LocalStore, local_store).get(
+                    "user_ids", "", username.lower(), self.MISSING_USERS_CACHE_TTL
+                )
+                is None
+            ):
+                # Users which were missing may have been created since.
+                unresolved.append(i)
 
         databaseIdPattern: re.Pattern = re.compile(
             r"https://avatars.githubusercontent.com/u/(\d+)?.*"
         )
+        # we use the `repositoryOwner` query which is the only one that
+        # works on both users and orgs with graphql. REST is less picky
+        # and the /user endpoint works for all types.
+        fields = [
+            f'repositoryOwner(login: "{user_list[i]}") '
+            "{ login avatarUrl "
+            "... on User { databaseId } "
+            "... on Organization { databaseId } }"
+            for i in unresolved
+        ]
+        results = self.request_aliased_fields(
+            fields, "user", self.USER_IDS_BATCH_SIZE, self.USER_IDS_MAX_WORKERS
+        )
         # replace manually provided org/repo values by the ones obtained
         # from github api. This guarantees that case is correct in the output data.
         # See https://github.com/MeltanoLabs/tap-github/issues/110
         # Also remove repos which do not exist to avoid crashing further down
         # the line.
-        for record in temp_stream.request_records({}):
-            for item in record.keys():
-                try:
-                    username = record[item]["login"]
-                except TypeError:
-                    # one of the usernames returned `None`, which means it does
-                    # not exist, log some details, and move on to the next one
-                    invalid_username = user_list[int(item[4:])]
-                    self.logger.info(
-                        (
-                            f"Username not found: {invalid_username} \t"
-                            "Removing it from list"
-                        )
-                    )
-                    continue
-                # the databaseId (in graphql language) is not available on
-                # repositoryOwner, so we parse the avatarUrl to get it :/
-                m = databaseIdPattern.match(record[item]["avatarUrl"])
-                if m is not None:
-                    dbId = m.group(1)
-                    users_with_ids.append({"username": username, "user_id": dbId})
-                else:
+        for index, result in results:
+            i = unresolved[index]
+            if result is None:
+                # one of the usernames returned `None`, which means it does
+                # not exist, log some details, and move on to the next one
+                self.logger.info(
+                    f"Username not found: {user_list[i]} \tRemoving it from list"
+                )
+                if local_store is not None:
+                    local_store.set("user_ids", "", user_list[i].lower(), "null")
+                continue
+            if result.get("databaseId") is not None:
+                dbId = str(result["databaseId"])
+            else:
+                # the databaseId is not part of the repositoryOwner
+                # interface, so fall back to parsing the avatarUrl :/
+                m = databaseIdPattern.match(result["avatarUrl"])
+                if m is None:
                     # If we get here, github's API is not returning what
                     # we expected, so it's most likely a breaking change on
                     # their end, and the tap's code needs updating
                     raise FatalAPIError("Unexpected GitHub API error: Breaking change?")
+                dbId = m.group(1)
+            users_by_index[i] = {"username": result["login"], "user_id": dbId}
+            if local_store is not None:
+                local_store.set(
+                    "user_ids",
+                    "",
+                    user_list[i].lower(),
+                    json.dumps(users_by_index[i]),
+                )
+        if local_store is not None:
+            local_store.commit()
 
+        users_with_ids = [users_by_index[i] for i in sorted(users_by_index)]
         self.logger.info(f"Running the tap on {len(users_with_ids)} users")
         return users_with_ids
 
@@ -267,34 +297,45 @@ class UserContributedToStream(GitHubGraphqlStream):
     # TODO - change partitioning key to user_id?
     state_partitioning_keys = ["username"]
     ignore_parent_replication_key = True
+    adaptive_page_size = True
+    page_size_variables = {"pageSize_0": 100}
 
     @property
     def query(self) -> str:
         """Return dynamic GraphQL query."""
         # Graphql id is equivalent to REST node_id. To keep the tap consistent, we rename "id" to "node_id".
-        return """
-          query userContributedTo($username: String! $nextPageCursor_0: String) {
+        repository_fields = self.get_graphql_selection(
+            """
+            node_id: id
+            name_with_owner: nameWithOwner
+            open_graph_image_url: openGraphImageUrl
+            stargazer_count: stargazerCount
+            owner {
+              node_id: id
+              login
+            }
+            """
+        )
+        return (
+            """
+          query userContributedTo($username: String! $nextPageCursor_0: String $pageSize_0: Int!) {
             user (login: $username) {
-              repositoriesContributedTo (first: 100 after: $nextPageCursor_0 includeUserRepositories: true orderBy: {field: STARGAZERS, direction: DESC}) {
+              repositoriesContributedTo (first: $pageSize_0 after: $nextPageCursor_0 includeUserRepositories: true orderBy: {field: STARGAZERS, direction: DESC}) {
                 pageInfo {
                   hasNextPage_0: hasNextPage
                   startCursor_0: startCursor
                   endCursor_0: endCursor
                 }
                 nodes {
-                  node_id: id
-                  name_with_owner: nameWithOwner
-                  open_graph_image_url: openGraphImageUrl
-                  stargazer_count: stargazerCount
-                  owner {
-                    node_id: id
-                    login
-                  }
+            """
+            + repository_fields
+            + """
                 }
               }
             }
           }
         """
+        )
 
     schema = th.PropertiesList(
         th.Property("node_id", th.StringType),
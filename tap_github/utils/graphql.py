@@ -0,0 +1,74 @@
+"""Projection of GraphQL selection sets on the properties selected in the catalog.
+
+Fields are matched to properties by their output name, i.e. their alias if any:
+in `node_id: id`, the field `id` is requested only if `node_id` is selected.
+Sub-selections are projected on the sub-properties of the field, and inline
+fragments (`... on User { }`) on the properties of their enclosing field.
+"""
+
+import re
+from typing import Callable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r'\.\.\.|[{}():]|"(?:[^"\\]|\\.)*"|[^\s{}():,"]+')
+
+
+def skip_arguments(tokens: List[str], position: int) -> int:
+    """Return the position after the balanced parentheses starting at `position`."""
+    depth = 0
+    while True:
+        if tokens[position] == "(":
+            depth += 1
+        elif tokens[position] == ")":
+            depth -= 1
+        position += 1
+        if depth == 0:
+            return position
+
+
+def project_tokens(
+    tokens: List[str],
+    position: int,
+    is_selected: Callable[[Tuple[str, ...]], bool],
+    path: Tuple[str, ...],
+) -> Tuple[List[str], int]:
+    """Project the fields of a selection set, until its closing brace or the end.
+
+    Return the tokens of the projected fields, and the position of the brace.
+    """
+    result: List[str] = []
+    while position < len(tokens) and tokens[position] != "}":
+        start = position
+        field_path = path
+        if tokens[position] == "...":
+            # An inline fragment `... on Type`, or a named fragment spread.
+            position += 3 if tokens[position + 1] == "on" else 2
+        else:
+            output_name = tokens[position]
+            position += 1
+            if position < len(tokens) and tokens[position] == ":":
+                position += 2
+            if position < len(tokens) and tokens[position] == "(":
+                position = skip_arguments(tokens, position)
+            field_path = path + (output_name,)
+
+        if position < len(tokens) and tokens[position] == "{":
+            brace = position
+            selection, position = project_tokens(
+                tokens, position + 1, is_selected, field_path
+            )
+            position += 1
+            if selection and (field_path == path or is_selected(field_path)):
+                result += tokens[start : brace + 1] + selection + ["}"]
+        elif field_path == path or is_selected(field_path):
+            result += tokens[start:position]
+    return result, position
+
+
+def project_selection(
+    selection: str, is_selected: Callable[[Tuple[str, ...]], bool]
+) -> str:
+    """Return the fields of `selection` whose property path is selected."""
+    tokens, _ = project_tokens(
+        TOKEN_PATTERN.findall(selection), 0, is_selected, path=()
+    )
+    return " ".join(tokens)
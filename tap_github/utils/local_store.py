@@ -0,0 +1,118 @@
+"""A small sqlite store to keep data between runs, next to the tap's state."""
+
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Optional
+
+
+class LocalStore(object):
+    """Key-value store partitioned by namespace (usually a stream name) and partition.
+
+    Entries which were not written for `ttl` seconds are evicted, as well as the
+    oldest entries beyond `max_rows` in each namespace. This bounds the size of
+    the store when partitions such as repositories or teams disappear, without
+    letting a large namespace (e.g. the commits of a big repository) evict the
+    entries of the others.
+    """
+
+    DEFAULT_TTL = 30 * 24 * 3600  # 30 days
+    DEFAULT_MAX_ROWS = 1_000_000
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DEFAULT_TTL,
+        max_rows: int = DEFAULT_MAX_ROWS,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT NOT NULL, "
+            "partition TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "value TEXT, "
+            "updated_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, partition, key))"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_updated_at ON entries (updated_at)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_namespace_updated_at "
+            "ON entries (namespace, updated_at)"
+        )
+        self.evict()
+
+    def get(
+        self,
+        namespace: str,
+        partition: str,
+        key: str,
+        max_age: Optional[float] = None,
+    ) -> Optional[str]:
+        """Return the value of an entry, or None if it does not exist.
+
+        With `max_age` (seconds), entries written earlier are ignored.
+        """
+        row = self.connection.execute(
+            "SELECT value, updated_at FROM entries "
+            "WHERE namespace = ? AND partition = ? AND key = ?",
+            (namespace, partition, key),
+        ).fetchone()
+        if row is None or (max_age is not None and row[1] < time.time() - max_age):
+            return None
+        return row[0]
+
+    def set(self, namespace: str, partition: str, key: str, value: str) -> None:
+        """Create or update an entry, refreshing its `updated_at`."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (namespace, partition, key, value, time.time()),
+        )
+
+    def sweep(self, namespace: str, partition: str, before: float) -> None:
+        """Delete the entries of a partition which were not written since `before`.
+
+        Call this after a complete sync of the partition, to forget about
+        records which no longer exist upstream.
+        """
+        self.connection.execute(
+            "DELETE FROM entries "
+            "WHERE namespace = ? AND partition = ? AND updated_at < ?",
+            (namespace, partition, before),
+        )
+        self.commit()
+
+    def evict(self) -> None:
+        """Delete expired entries, then the oldest entries beyond `max_rows`.
+
+        The limit applies to each namespace separately.
+        """
+        self.connection.execute(
+            "DELETE FROM entries WHERE updated_at < ?", (time.time() - self.ttl,)
+        )
+        namespaces = [
+            row[0]
+            for row in self.connection.execute("SELECT DISTINCT namespace FROM entries")
+        ]
+        for namespace in namespaces:
+            self.connection.execute(
+                "DELETE FROM entries WHERE rowid IN ("
+                "SELECT rowid FROM entries WHERE namespace = ? "
+                "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (namespace, self.max_rows),
+            )
+        self.commit()
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+
+@lru_cache(maxsize=None)
+def open_local_store(path: str) -> LocalStore:
+    """Return the store at `path`, shared by all the streams of the tap."""
+    return LocalStore(path)
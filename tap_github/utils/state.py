@@ -0,0 +1,306 @@
+"""Compact encoding of the tap state, for runs with tens of thousands of partitions.
+
+The SDK stores one object per partition, with its full context:
+
+    {"context": {"org": "MeltanoLabs", "repo": "tap-github"},
+     "replication_key": "updated_at", "replication_key_value": "2022-06-01"}
+
+With `compact_state`, partitions of a repository are keyed by its integer id,
+followed by the values of other context keys if any (e.g. `[1234,5678]` for a
+project_id). The repository names are stored once, in the `repo_names` table of
+the repositories stream state. Empty bookmarks are omitted:
+
+    {"compact_partitions": {
+        "context_keys": ["org", "repo"],
+        "replication_key": "updated_at",
+        "partitions": {"1234": {"replication_key_value": "2022-06-01"}}}}
+
+Partitions which cannot be compacted, e.g. for a repository missing from the
+`repo_names` table, are kept in the verbose format.
+
+With `delta_state_messages`, STATE messages between two full states only hold
+the bookmarks which changed since the previous message, and `"delta": true`.
+Partitions are replaced as a whole, and deleted stream keys are listed in
+`deleted_keys`. Use `merge_state` to apply them to the previous full state.
+"""
+
+import copy
+import json
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import singer
+
+REPO_CONTEXT_KEYS = ["org", "repo", "repo_id"]
+
+
+def is_empty(value: Any) -> bool:
+    return value is None or value == {} or value == []
+
+
+def get_repo_names(state: dict) -> Dict[str, List[str]]:
+    """Return the table of repository names by id, from the repositories state."""
+    return state.get("bookmarks", {}).get("repositories", {}).get("repo_names", {})
+
+
+def get_partition_key(
+    context: dict,
+    repo_names: Dict[str, List[str]],
+    repo_ids: Dict[Tuple[str, str], int],
+) -> Optional[str]:
+    """Return the compact key of a partition, or None if it cannot be compacted.
+
+    Repositories missing from `repo_names` and `repo_ids` are added when the
+    context has both the repository name and its id.
+    """
+    if ("org" in context) != ("repo" in context):
+        return None
+    repo_id = context.get("repo_id")
+    if "org" in context and "repo" in context:
+        name = (context["org"], context["repo"])
+        if repo_id is None:
+            repo_id = repo_ids.get(name)
+        elif tuple(repo_names.setdefault(str(repo_id), list(name))) != name:
+            # The repository was renamed, keep this partition verbose.
+            return None
+        else:
+            repo_ids[name] = repo_id
+    if not isinstance(repo_id, int):
+        return None
+
+    values = [repo_id] + [
+        context[key] for key in sorted(context) if key not in REPO_CONTEXT_KEYS
+    ]
+    return json.dumps(values if len(values) > 1 else repo_id, separators=(",", ":"))
+
+
+def compact_stream_state(
+    stream_state: dict,
+    repo_names: Dict[str, List[str]],
+    repo_ids: Dict[Tuple[str, str], int],
+) -> dict:
+    """Return the compact encoding of the state of a stream."""
+    result = {
+        key: value
+        for key, value in stream_state.items()
+        if key != "partitions" and not is_empty(value)
+    }
+    group: Optional[dict] = None
+    verbose_partitions = []
+    for partition in stream_state.get("partitions", []):
+        context = partition["context"]
+        bookmark = {
+            key: value
+            for key, value in partition.items()
+            if key != "context" and not is_empty(value)
+        }
+        if not bookmark:
+            continue
+
+        partition_key = get_partition_key(context, repo_names, repo_ids)
+        if group is None and partition_key is not None:
+            group = {
+                "context_keys": sorted(context),
+                "replication_key": bookmark.get("replication_key"),
+                "partitions": {},
+            }
+        if (
+            partition_key is None
+            or group is None
+            or group["context_keys"] != sorted(context)
+            or partition_key in group["partitions"]
+        ):
+            verbose_partitions.append({"context": context, **bookmark})
+            continue
+
+        if bookmark.get("replication_key") == group["replication_key"]:
+            bookmark.pop("replication_key", None)
+        group["partitions"][partition_key] = bookmark
+
+    if group is not None:
+        result["compact_partitions"] = {
+            key: value for key, value in group.items() if value is not None
+        }
+    if verbose_partitions:
+        result["partitions"] = verbose_partitions
+    return result
+
+
+def compact_state(state: dict) -> dict:
+    """Return the compact encoding of the tap state, without modifying it."""
+    repo_names = copy.deepcopy(get_repo_names(state))
+    repo_ids = {
+        (org, repo): int(repo_id) for repo_id, (org, repo) in repo_names.items()
+    }
+    bookmarks = {
+        stream_name: compact_stream_state(stream_state, repo_names, repo_ids)
+        for stream_name, stream_state in state.get("bookmarks", {}).items()
+    }
+    if repo_names:
+        bookmarks.setdefault("repositories", {})["repo_names"] = repo_names
+    return {**state, "bookmarks": bookmarks}
+
+
+def expand_state(state: dict) -> dict:
+    """Return the verbose encoding of a state, which may be compact or not."""
+    state = copy.deepcopy(state)
+    repo_names = get_repo_names(state)
+    for stream_state in state.get("bookmarks", {}).values():
+        group = stream_state.pop("compact_partitions", None)
+        if group is None:
+            continue
+
+        extra_keys = [
+            key for key in group["context_keys"] if key not in REPO_CONTEXT_KEYS
+        ]
+        partitions = stream_state.setdefault("partitions", [])
+        for partition_key, bookmark in group["partitions"].items():
+            values = json.loads(partition_key)
+            if not isinstance(values, list):
+                values = [values]
+            repo_id = values[0]
+            context = dict(zip(extra_keys, values[1:]))
+            if "org" in group["context_keys"]:
+                context["org"], context["repo"] = repo_names[str(repo_id)]
+            if "repo_id" in group["context_keys"]:
+                context["repo_id"] = repo_id
+            if group.get("replication_key") and "replication_key" not in bookmark:
+                bookmark["replication_key"] = group["replication_key"]
+            partitions.append({"context": context, **bookmark})
+    return state
+
+
+def get_context_key(context: dict) -> str:
+    return json.dumps(context, sort_keys=True, default=str)
+
+
+def merge_state(state: dict, delta: dict) -> dict:
+    """Apply a delta STATE message to the previous full state, compact or not.
+
+    Returns the full verbose state, e.g. to resume a run which failed after
+    writing delta messages.
+    """
+    state = expand_state(state)
+    for stream_name, stream_changes in delta.get("bookmarks", {}).items():
+        stream_state = state.setdefault("bookmarks", {}).setdefault(stream_name, {})
+        partitions = {
+            get_context_key(partition["context"]): partition
+            for partition in stream_state.get("partitions", [])
+        }
+        for key, value in stream_changes.items():
+            if key == "deleted_keys":
+                for deleted_key in value:
+                    stream_state.pop(deleted_key, None)
+            elif key != "partitions":
+                stream_state[key] = copy.deepcopy(value)
+        for partition in stream_changes.get("partitions", []):
+            partitions[get_context_key(partition["context"])] = copy.deepcopy(partition)
+        if partitions:
+            stream_state["partitions"] = list(partitions.values())
+    return state
+
+
+class StateWriter(object):
+    """Write STATE messages for all the streams of a tap.
+
+    With the `state_message_interval` (seconds) or `state_message_records` settings,
+    messages are only written once the interval elapsed or this many records
+    were written, instead of after every partition. Forced messages, e.g. at the
+    end of the sync of a top-level stream, are always written in full.
+
+    With `delta_state_messages`, streams report the states they may modify with
+    `mark_dirty`, and messages in between full states only hold these states.
+    """
+
+    # Every this many messages, a full state is written even with
+    # `delta_state_messages`, so that targets keeping the last message can resume.
+    FULL_STATE_INTERVAL = 100
+
+    def __init__(self, config: dict) -> None:
+        self.compact = bool(config.get("compact_state"))
+        self.delta = bool(config.get("delta_state_messages"))
+        self.interval: Optional[float] = config.get("state_message_interval")
+        self.record_interval: Optional[int] = config.get("state_message_records")
+        self.last_written_at = time.monotonic()
+        self.records_since_written = 0
+        # None until the first full state is written.
+        self.messages_since_full: Optional[int] = None
+        # States modified since the previous message, by stream name: the stream
+        # state itself, and partition states by id.
+        self.dirty_streams: Dict[str, dict] = {}
+        self.dirty_partitions: Dict[str, Dict[int, dict]] = {}
+        # Keys of each stream state in the previous messages, to report deletions.
+        self.stream_keys: Dict[str, Set[str]] = {}
+
+    def record_written(self) -> None:
+        self.records_since_written += 1
+
+    def mark_dirty(self, stream_name: str, stream_state: dict, state: dict) -> None:
+        """Report a state which may change before the next message.
+
+        `state` is either `stream_state` itself or the state of one of its partitions.
+        """
+        if not self.delta:
+            return
+        if state is stream_state:
+            self.dirty_streams[stream_name] = stream_state
+        else:
+            self.dirty_partitions.setdefault(stream_name, {})[id(state)] = state
+
+    def is_due(self) -> bool:
+        """Return True if a STATE message should be written now."""
+        if self.interval is None and self.record_interval is None:
+            return True
+        if (
+            self.interval is not None
+            and time.monotonic() - self.last_written_at >= self.interval
+        ):
+            return True
+        return (
+            self.record_interval is not None
+            and self.records_since_written >= self.record_interval
+        )
+
+    def get_delta(self) -> dict:
+        """Return the states marked dirty since the previous message."""
+        bookmarks: Dict[str, dict] = {}
+        for stream_name, stream_state in self.dirty_streams.items():
+            keys = {key for key in stream_state if key != "partitions"}
+            changes = {key: stream_state[key] for key in keys}
+            deleted_keys = self.stream_keys.get(stream_name, set()) - keys
+            if deleted_keys:
+                changes["deleted_keys"] = sorted(deleted_keys)
+            self.stream_keys[stream_name] = keys
+            bookmarks[stream_name] = changes
+        for stream_name, partitions in self.dirty_partitions.items():
+            bookmarks.setdefault(stream_name, {})["partitions"] = list(
+                partitions.values()
+            )
+        return {"delta": True, "bookmarks": copy.deepcopy(bookmarks)}
+
+    def write(self, state: dict, force: bool = False) -> None:
+        """Write a STATE message if it is due, or if forced."""
+        if not force and not self.is_due():
+            return
+        self.last_written_at = time.monotonic()
+        self.records_since_written = 0
+
+        if (
+            self.delta
+            and not force
+            and self.messages_since_full is not None
+            and self.messages_since_full + 1 < self.FULL_STATE_INTERVAL
+        ):
+            value = self.get_delta()
+            self.messages_since_full += 1
+        else:
+            value = compact_state(state) if self.compact else state
+            self.messages_since_full = 0
+            if self.delta:
+                self.stream_keys = {
+                    stream_name: {key for key in stream_state if key != "partitions"}
+                    for stream_name, stream_state in state.get("bookmarks", {}).items()
+                }
+        self.dirty_streams = {}
+        self.dirty_partitions = {}
+        singer.write_message(singer.StateMessage(value=value))